@@ -3,6 +3,7 @@ import src.computations as src
 INFO_FILENAME = "data/bond_info.csv"
 PRICE_FILENAME = "data/bond_prices.csv"
 OUTPUT_FOLDER = "output/"
+CACHE_DIR = "cache/"
 ISINS = ['CA135087J546',
          'CA135087J967',
          'CA135087K528',
@@ -16,7 +17,7 @@ ISINS = ['CA135087J546',
          'CA135087Q988']
 
 if __name__ == "__main__":
-    df = src.build_data(INFO_FILENAME, PRICE_FILENAME)
+    df = src.build_data(INFO_FILENAME, PRICE_FILENAME, cache_dir=CACHE_DIR)
     df.to_csv("output/constructed_data.csv")
     df = df.sort_values(by="Date Collected", ascending=True)
     bonds = src.get_bonds(df)
@@ -35,14 +36,14 @@ if __name__ == "__main__":
 
     # FR Step
     print("Computing forward rates")
-    fr = src.get_all_fr(sr)
+    cube = src.CurveCube.from_curves(sr, dates)
+    fr = cube.forward_rates(365)
     src.plot_fr(fr, date_strs, OUTPUT_FOLDER)
 
     # Cov Step
     ## Compute ytm covariance metrics
     print("Computing covariance characteristics for YTM")
-    year_sr = src.get_year_srs(sr)
-    sr_cov = src.construct_cov(year_sr, src.daily_log_returns)
+    sr_cov = cube.cov()
     print(src.matrix_to_latex(sr_cov))
     print(src.eval_evec_to_latex(sr_cov))
     ## Compute fr covariance metrics
@@ -0,0 +1,165 @@
+import os
+import numpy as np
+import pandas as pd
+
+YEARLY_TENORS = [365*x for x in range(1,6)]
+
+
+def stack_curves(curves: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The sorted keys and values of every curve concatenated into two flat arrays,
+    with offsets: curve i's points are [offsets[i]:offsets[i+1]].
+    """
+    points = [curve.sorted_key_vals() for curve in curves]
+    offsets = np.zeros(len(points) + 1, dtype=np.int64)
+    np.cumsum([len(x) for x, _ in points], out=offsets[1:])
+    keys = np.fromiter((k for x, _ in points for k in x), dtype=float, count=offsets[-1])
+    values = np.fromiter((v for _, y in points for v in y), dtype=float, count=offsets[-1])
+    return keys, values, offsets
+
+
+def interpolate_stacked(keys: np.ndarray, values: np.ndarray, offsets: np.ndarray, tenors) -> np.ndarray:
+    """
+    Linearly interpolates every stacked curve (see stack_curves) at every tenor
+    in one searchsorted pass, flat past either end of each curve. Returns a
+    (curves, len(tenors)) array, with NaN rows for empty curves.
+
+    Each curve's keys are shifted into their own disjoint range, so one sorted
+    array holds every curve and no loop over curves is needed.
+    """
+    tenors = np.asarray(tenors, dtype=float)
+    n = len(offsets) - 1
+    out = np.full((n, len(tenors)), np.nan)
+    full = np.flatnonzero(np.diff(offsets) > 0)
+    if len(full) == 0 or len(tenors) == 0:
+        return out
+    first, last = keys[offsets[full]], keys[offsets[full+1] - 1]
+    k = np.clip(tenors, first[:, None], last[:, None])
+    span = max(keys.max(), tenors.max()) - min(keys.min(), tenors.min()) + 1
+    rows = np.repeat(np.arange(n), np.diff(offsets))
+    i = np.searchsorted(keys + rows * span, k + full[:, None] * span)
+    hit = keys[i] == k
+    lo = np.maximum(i - 1, offsets[full][:, None])
+    dx = np.where(hit, 1.0, keys[i] - keys[lo])
+    y0 = values[lo]
+    out[full] = np.where(hit, values[i], y0 + (values[i] - y0) * (k - keys[lo]) / dx)
+    return out
+
+
+class CurveCube:
+    """
+    Rates of many dates' curves on one shared tenor grid, held as a single
+    dates x tenors array so analytics across the history are array operations.
+
+    === Attributes ===
+    - dates: the date of each row (datetime64[D]), or row numbers if no dates were given
+    - tenors: the tenor of each column, in days, ascending
+    - rates: the rates, of shape (len(dates), len(tenors))
+    """
+    dates: np.ndarray
+    tenors: np.ndarray
+    rates: np.ndarray
+
+    def __init__(self, dates, tenors, rates) -> None:
+        self.dates = np.asarray(dates)
+        self.tenors = np.asarray(tenors, dtype=np.int64)
+        self.rates = np.asanyarray(rates, dtype=float)
+        if self.rates.shape != (len(self.dates), len(self.tenors)):
+            raise ValueError("rates must have one row per date and one column per tenor")
+        if np.any(np.diff(self.tenors) <= 0):
+            raise ValueError("tenors must be strictly increasing")
+
+    @classmethod
+    def from_curves(cls, curves: list, dates=None, tenors=YEARLY_TENORS) -> 'CurveCube':
+        """
+        Interpolates each curve (a BinarySortedDict or CompiledCurve, e.g. from
+        get_all_sr) onto tenors, leaving the curves unchanged.
+        """
+        if dates is None:
+            dates = np.arange(len(curves))
+        else:
+            dates = pd.DatetimeIndex(dates).values.astype("datetime64[D]")
+        return cls(dates, tenors, interpolate_stacked(*stack_curves(curves), tenors))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def save(self, path: str) -> None:
+        """
+        Saves this cube to the folder path as plain .npy files, which load() can memory-map.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in ("dates", "tenors", "rates"):
+            np.save(os.path.join(path, name + ".npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str | None = "r") -> 'CurveCube':
+        """
+        Loads a cube saved by save(). With the default mmap_mode the rates are
+        memory-mapped read-only, so many processes can share one copy of a large history.
+        """
+        dates = np.load(os.path.join(path, "dates.npy"))
+        tenors = np.load(os.path.join(path, "tenors.npy"))
+        rates = np.load(os.path.join(path, "rates.npy"), mmap_mode=mmap_mode)
+        return cls(dates, tenors, rates)
+
+    def interpolate(self, tenors) -> np.ndarray:
+        """
+        The rates of every date at tenors, linearly interpolated along the grid
+        (flat past either end), as a (dates, len(tenors)) array.
+        """
+        keys = np.clip(np.asarray(tenors, dtype=float), self.tenors[0], self.tenors[-1])
+        if len(self.tenors) == 1:
+            return np.repeat(self.rates, len(keys), axis=1)
+        j = np.clip(np.searchsorted(self.tenors, keys), 1, len(self.tenors) - 1)
+        x0, x1 = self.tenors[j-1], self.tenors[j]
+        w = (keys - x0) / (x1 - x0)
+        return self.rates[:, j-1] * (1 - w) + self.rates[:, j] * w
+
+    def at(self, tenors) -> 'CurveCube':
+        """
+        Returns a cube of the same dates on another tenor grid.
+        """
+        return CurveCube(self.dates, tenors, self.interpolate(tenors))
+
+    def forward_rates(self, start: int = 365, ends=None) -> np.ndarray:
+        """
+        The forward rates from start to each of ends (days; defaults to the grid
+        tenors past start) for every date, as a (dates, len(ends)) array:
+            (r(end) * end - r(start) * start) / (end - start)
+        """
+        ends = self.tenors[self.tenors > start] if ends is None else np.asarray(ends)
+        r_start = self.interpolate([start])
+        r_end = self.interpolate(ends)
+        return (r_end * ends - r_start * start) / (ends - start)
+
+    def forward_surface(self, starts, ends) -> np.ndarray:
+        """
+        The forward rate from every start tenor to every end tenor (days) for every
+        date, in one array pass, of shape (dates, len(starts), len(ends)):
+            (r(end) * end - r(start) * start) / (end - start)
+        Cells with end <= start are NaN. Rates off the grid are interpolated along
+        it, so build the cube on a grid holding starts and ends (see
+        get_forward_surface) to read them straight from the curves.
+        """
+        starts = np.asarray(starts, dtype=float)
+        ends = np.asarray(ends, dtype=float)
+        r_start = self.interpolate(starts)[:, :, None]
+        r_end = self.interpolate(ends)[:, None, :]
+        length = ends[None, :] - starts[:, None]
+        valid = length > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            surface = (r_end * ends[None, :] - r_start * starts[:, None]) / length
+        return np.where(valid, surface, np.nan)
+
+    def log_returns(self) -> np.ndarray:
+        """
+        Daily log returns of every tenor, of shape (dates-1, tenors).
+        """
+        return np.log(self.rates[1:] / self.rates[:-1])
+
+    def cov(self) -> np.ndarray:
+        """
+        The covariance between tenors of the daily log returns.
+        """
+        return np.cov(self.log_returns(), rowvar=False)
@@ -1,7 +1,12 @@
 import numpy as np
+from bisect import bisect_right
 import pandas as pd
 import matplotlib.pyplot as plt
-from src.BinarySortedDict import BinarySortedDict
+from src.BinarySortedDict import BinarySortedDict, interpolate_sorted
+from src.DataCache import cached_frame
+from src.parallel import AttachedArrays, map_shared
+from src.CurveCube import CurveCube
+from src.covariance import sorted_eigh, log_returns, RollingPCA
 
 
 output_folder = "output/"
@@ -41,23 +46,98 @@ def get_bonds(df: pd.DataFrame) -> list[Bond]:
     return bonds
 
 
-def get_last_coupon_payment_date(row):
-    date = row["Coupon Start Date"]
-    while date + pd.DateOffset(months=6) < row["Date Collected"]:
-        date = date + pd.DateOffset(months=6)
-    return date
-
-def get_future_coupon_payments(row):
-    date = row["Last Coupon Payment Date"] + pd.DateOffset(months=6)
-    periods = []
-    while date < row["Maturity Date"]:
-        period = (date - row["Date Collected"]).days
-        periods.append(period)
-        date = date + pd.DateOffset(months=6)
-    return periods
-
-
-def build_data(info_filename: str, price_filename: str) -> pd.DataFrame:
+def coupon_schedules(start_dates: np.ndarray, maturity_dates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the semi-annual coupon schedule of every bond at once using integer month arithmetic.
+
+    Returns (dates, offsets) where the schedule of bond i is dates[offsets[i]:offsets[i+1]]:
+    its coupon start date stepped by 6 months up to and including the first date on or
+    after its maturity. As when stepping with pd.DateOffset(months=6), a day clamped to
+    the end of a short month stays clamped for the rest of the schedule.
+
+    === Parameters ===
+    - start_dates: the first coupon date of each bond
+    - maturity_dates: the maturity date of each bond
+    """
+    start = np.asarray(start_dates).astype("datetime64[D]")
+    maturity = np.asarray(maturity_dates).astype("datetime64[D]")
+    start_month = start.astype("datetime64[M]")
+    day = (start - start_month.astype("datetime64[D]")).astype(int) + 1
+    months_to_maturity = (maturity.astype("datetime64[M]") - start_month).astype(int)
+    width = max(int(np.max(months_to_maturity, initial=0)) // 6 + 2, 1)
+    steps = np.arange(width)
+    months = start_month[:, None] + 6*steps
+    month_len = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(int)
+    days = np.minimum.accumulate(np.minimum(day[:, None], month_len), axis=1)
+    dates = months.astype("datetime64[D]") + (days - 1)
+    counts = np.minimum((dates < maturity[:, None]).sum(axis=1) + 1, width)
+    offsets = np.zeros(len(start) + 1, dtype=int)
+    np.cumsum(counts, out=offsets[1:])
+    return dates[steps < counts[:, None]], offsets
+
+
+def offset_coupon_schedules(df: pd.DataFrame, date_column: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Offsets each ISIN's coupon schedule against the price date of every row of df.
+
+    Each ISIN's schedule is built once and shared by all of its rows. Returns
+    (last_coupon_dates, periods, offsets): the most recent coupon date of each row,
+    and the day counts from the row's price date to each remaining coupon date before
+    maturity, where row i's day counts are periods[offsets[i]:offsets[i+1]].
+
+    === Parameters ===
+    - df: rows with columns ISIN, Coupon Start Date, Maturity Date and date_column
+    - date_column: the column holding each row's price date
+    """
+    codes, isins = pd.factorize(df["ISIN"])
+    first = np.unique(codes, return_index=True)[1]
+    start = df["Coupon Start Date"].to_numpy()[first]
+    maturity = df["Maturity Date"].to_numpy().astype("datetime64[D]")
+    schedule, schedule_offsets = coupon_schedules(start, maturity[first])
+    price_dates = df[date_column].to_numpy().astype("datetime64[D]")
+
+    # Schedules are sorted within each ISIN, so tagging every date with its ISIN code
+    # gives one globally sorted key that a single searchsorted can offset against.
+    span = np.int64(1) << 32
+    segment = np.repeat(np.arange(len(isins)), np.diff(schedule_offsets))
+    keys = segment * span + schedule.astype(np.int64)
+    seg_start = schedule_offsets[codes]
+    first_on_or_after = np.searchsorted(keys, codes * span + price_dates.astype(np.int64))
+    last = np.maximum(first_on_or_after - 1, seg_start)
+    before_maturity = np.searchsorted(keys, codes * span + maturity.astype(np.int64))
+
+    counts = np.maximum(before_maturity - (last + 1), 0)
+    offsets = np.zeros(len(df) + 1, dtype=int)
+    np.cumsum(counts, out=offsets[1:])
+    index = np.repeat(last + 1 - offsets[:-1], counts) + np.arange(offsets[-1])
+    periods = (schedule[index] - np.repeat(price_dates, counts)).astype(np.int64)
+    return schedule[last], periods, offsets
+
+
+def index_by_isin(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The first row of df for each ISIN, indexed by ISIN.
+    Frames from partition_by_date are already in this form and are returned as is.
+    """
+    if df.index.name == "ISIN":
+        return df
+    return df.drop_duplicates(subset=["ISIN"]).set_index("ISIN")
+
+
+def partition_by_date(df: pd.DataFrame) -> dict:
+    """
+    Splits df by Date Collected in a single groupby pass.
+    Maps each date to that date's rows, indexed by ISIN (first row per ISIN).
+    """
+    return {pd.Timestamp(date): index_by_isin(rows)
+            for date, rows in df.groupby("Date Collected", sort=False)}
+
+
+def build_data(info_filename: str, price_filename: str, cache_dir: str = None) -> pd.DataFrame:
+    # Reuse the processed frame cached in cache_dir while neither CSV file has changed
+    if cache_dir is not None:
+        return cached_frame(cache_dir, [info_filename, price_filename],
+                            lambda: build_data(info_filename, price_filename))
     # Process info data
     info = pd.read_csv(info_filename)
     info["Coupon"] = info["Coupon"].astype(float) / 100.0
@@ -73,8 +153,9 @@ def build_data(info_filename: str, price_filename: str) -> pd.DataFrame:
     ### TEMPORARY
     df = df[df["ISIN"] != "CA135087Q988"]
     ### TEMPORARY
-    df["Last Coupon Payment Date"] = df.apply(get_last_coupon_payment_date, axis=1)
-    df["Coupon Periods"] = df.apply(get_future_coupon_payments, axis=1)
+    last_coupon_dates, periods, offsets = offset_coupon_schedules(df, "Date Collected")
+    df["Last Coupon Payment Date"] = last_coupon_dates.astype(df["Date Collected"].dtype)
+    df["Coupon Periods"] = [p.tolist() for p in np.split(periods, offsets[1:-1])]
     df["Dirty Price"] = df["Price"] + (FV * df["Coupon"]/2.0) * (df["Date Collected"] - df["Last Coupon Payment Date"]).dt.days / (365/2)
     df["Maturity Period"] = (df["Maturity Date"] - df["Date Collected"]).dt.days
     return df
@@ -111,20 +192,124 @@ def newton_raphson_ytm(P: float, coupon_periods: list, maturity_period: int, bon
     return ytm
 
 
+def batch_newton_raphson_ytm(times: np.ndarray, amounts: np.ndarray, prices: np.ndarray,
+                             guess: float = 0.03, tol: float = 1e-6,
+                             num_iter: int = 100) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Newton-Raphson YTM for every row of a zero-padded cashflow matrix at once.
+    Returns the YTM, the number of iterations used and whether the row converged,
+    for each row. A row converges once its step is finite and within tol.
+    A row whose step becomes NaN or infinite has diverged: it stops iterating,
+    is not converged and its YTM is NaN. Rows that used all num_iter iterations
+    without converging are the ones newton_raphson_ytm reports.
+    """
+    ytm = np.full(len(prices), guess, dtype=float)
+    iterations = np.zeros(len(prices), dtype=int)
+    converged = np.zeros(len(prices), dtype=bool)
+    diverged = np.zeros(len(prices), dtype=bool)
+    active = np.ones(len(prices), dtype=bool)
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        for _ in range(num_iter):
+            if not active.any():
+                break
+            t = times[active]
+            discounted = amounts[active] * np.exp(-ytm[active, None] * t)
+            P = discounted.sum(axis=1) - prices[active]
+            dP = -(discounted * t).sum(axis=1)
+            step = P / dP
+            ytm[active] -= step
+            iterations[active] += 1
+            finite = np.isfinite(step)
+            done = finite & (np.abs(step) <= tol)
+            converged[active] = done
+            diverged[active] = ~finite
+            active[active] = finite & ~done
+    ytm[diverged] = np.nan
+    return ytm, iterations, converged
+
+
+def cashflow_matrices(bonds: list, df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Zero-padded cashflow times (in years) and amounts for each row of df.
+    Every row's ISIN must be one of bonds'.
+    """
+    coupon_payment = {bond.isin: bond.coupon_payment for bond in bonds}
+    notional = {bond.isin: bond.notional for bond in bonds}
+    coupon_periods = df["Coupon Periods"].tolist()
+    width = max((len(periods) for periods in coupon_periods), default=0) + 1
+    times = np.zeros((len(df), width))
+    amounts = np.zeros((len(df), width))
+    for i, (isin, periods, maturity_period) in enumerate(zip(df["ISIN"], coupon_periods, df["Maturity Period"])):
+        if isin not in coupon_payment:
+            raise ValueError(f"no bond with ISIN {isin}")
+        n = len(periods)
+        times[i, :n] = np.asarray(periods) / 365
+        amounts[i, :n] = coupon_payment[isin]
+        times[i, n] = maturity_period / 365
+        amounts[i, n] = notional[isin]
+    return times, amounts
+
+
+def _ytm_rows(bonds: list, df: pd.DataFrame, dates: list = None, jobs: int = 1, executor=None) -> pd.DataFrame:
+    """
+    The first row of df for each (date, bond) pair, with its solved YTM, the
+    number of iterations used and whether the solver converged.
+    With jobs > 1 (or an executor) the dates are solved across worker processes.
+    """
+    df = df[df["ISIN"].isin([bond.isin for bond in bonds])]
+    df = df.drop_duplicates(subset=["Date Collected", "ISIN"])
+    if jobs == 1 and executor is None:
+        times, amounts = cashflow_matrices(bonds, df)
+        ytm, iterations, converged = batch_newton_raphson_ytm(times, amounts, df["Dirty Price"].to_numpy(dtype=float))
+        return df.assign(YTM=ytm, Iterations=iterations, Converged=converged)
+    positions = pd.Index(dates).get_indexer(df["Date Collected"])
+    df = df.iloc[np.argsort(positions, kind="stable")]
+    times, amounts = cashflow_matrices(bonds, df)
+    date_offsets = np.searchsorted(np.sort(positions), np.arange(len(dates) + 1))
+    arrays = {"times": times, "amounts": amounts, "prices": df["Dirty Price"].to_numpy(dtype=float),
+              "date_offsets": date_offsets}
+    results = map_shared(_ytm_dates, arrays, len(dates), jobs=jobs, executor=executor)
+    ytm = np.concatenate([r[0] for r in results]) if results else np.zeros(0)
+    iterations = np.concatenate([r[1] for r in results]) if results else np.zeros(0, dtype=int)
+    converged = np.concatenate([r[2] for r in results]) if results else np.zeros(0, dtype=bool)
+    return df.assign(YTM=ytm, Iterations=iterations, Converged=converged)
+
+
+def _ytm_dates(spec, chunk):
+    # Worker for get_all_ytm: the YTM of each row of each date in chunk
+    with AttachedArrays(spec) as a:
+        return [batch_newton_raphson_ytm(a["times"][lo:hi], a["amounts"][lo:hi], a["prices"][lo:hi])
+                for lo, hi in ((a["date_offsets"][d], a["date_offsets"][d+1]) for d in chunk)]
+
+
+def _report_unconverged(rows: pd.DataFrame, num_iter: int = 100) -> None:
+    # Same report as newton_raphson_ytm, once per yield that used every iteration,
+    # and a separate one per yield that diverged (NaN)
+    diverged = rows["YTM"].isna()
+    exhausted = ~rows["Converged"] & ~diverged & (rows["Iterations"] == num_iter)
+    for _ in range(int(exhausted.sum())):
+        print("Max number of iterations reached.")
+    for _ in range(int(diverged.sum())):
+        print("Newton-Raphson diverged.")
+
+
 def compute_ytm(bonds: list, df: pd.DataFrame) -> BinarySortedDict:
     ytm = BinarySortedDict()
-    for bond in bonds:
-        dirty_price = df[df["ISIN"] == bond.isin].iloc[0]["Dirty Price"]
-        coupon_periods = df[df["ISIN"] == bond.isin].iloc[0]["Coupon Periods"]
-        maturity_period = df[df["ISIN"] == bond.isin].iloc[0]["Maturity Period"]
-        ytm[maturity_period] = newton_raphson_ytm(dirty_price, coupon_periods, maturity_period, bond)
+    rows = _ytm_rows(bonds, df)
+    _report_unconverged(rows)
+    for maturity_period, y in zip(rows["Maturity Period"], rows["YTM"]):
+        ytm[maturity_period] = y
     return ytm
 
 
-def get_all_ytm(bonds: list, df: pd.DataFrame, dates: list) -> list:
-    ytm = []
-    for date in dates:
-        ytm.append(compute_ytm(bonds, df[df["Date Collected"] == date]))
+def get_all_ytm(bonds: list, df: pd.DataFrame, dates: list, jobs: int = 1, executor=None) -> list:
+    ytm = [BinarySortedDict() for _ in dates]
+    rows = _ytm_rows(bonds, df[df["Date Collected"].isin(dates)], dates, jobs=jobs, executor=executor)
+    _report_unconverged(rows)
+    positions = pd.Index(dates).get_indexer(rows["Date Collected"])
+    for i, maturity_period, y in zip(positions, rows["Maturity Period"], rows["YTM"]):
+        if i >= 0:
+            ytm[i][maturity_period] = y
     return ytm
 
 
@@ -143,16 +328,23 @@ def plot_ytm(ytm, dates, output_folder) -> None:
 ### Spot Rate Computations ###
 ##############################
 def bootstrap(bonds, df, compounding_period=0):
+    rows = index_by_isin(df)
+    positions = rows.index.get_indexer([bond.isin for bond in bonds])
+    if np.any(positions < 0):
+        raise KeyError(bonds[int(np.argmin(positions))].isin)
+    dirty_prices = rows["Dirty Price"].to_numpy()[positions]
+    all_coupon_periods = rows["Coupon Periods"].to_numpy()[positions]
+    maturity_periods = rows["Maturity Period"].to_numpy()[positions]
     r = BinarySortedDict()
-    for bond in bonds:
-        dirty_price = df[df["ISIN"] == bond.isin].iloc[0]["Dirty Price"]
-        coupon_periods = df[df["ISIN"] == bond.isin].iloc[0]["Coupon Periods"]
-        maturity_period = df[df["ISIN"] == bond.isin].iloc[0]["Maturity Period"]
-
+    for bond, dirty_price, coupon_periods, maturity_period in zip(bonds, dirty_prices, all_coupon_periods, maturity_periods):
+        missing = [period for period in coupon_periods if period not in r]
+        if missing and len(r) == 0:
+            raise ValueError(f"coupon date {missing[0]} comes before the first known curve point")
+        if missing:  # interpolate
+            for period, rate in zip(missing, r.linearly_interpolate_many(missing)):
+                r.set_derived(period, float(rate))
         discounted_cf = 0
         for period in coupon_periods:
-            if period not in r:  # interpolate
-                r[period] = r.linearly_interpolate(period)
             if compounding_period == 0:
                 discounted_cf += bond.coupon_payment * continuous_time_period(r[period], period/365)
             elif compounding_period == 1:
@@ -163,6 +355,165 @@ def bootstrap(bonds, df, compounding_period=0):
             r[maturity_period] = annual_yield(bond.notional, dirty_price - discounted_cf, maturity_period/365)
     return r
 
+def bootstrap_matrix(bonds, df, compounding_period=0):
+    """
+    Same curve as bootstrap(), solved by forward substitution on the cashflow matrix.
+
+    With bonds in order, row i of the cashflow matrix only needs discount factors at
+    bond i's coupon dates, which the interpolation rule fixes from earlier knots (a
+    coupon date is linearly interpolated, flat past the ends, and becomes a knot),
+    and at its maturity. So the system is lower triangular and each row solves
+        DF(maturity) = (price - coupon * sum(DF(coupon dates))) / notional
+    Rates are only used for interpolation; compounding_period picks the map between
+    rates and discount factors (0: continuous, 1: annual).
+    """
+    rows = index_by_isin(df)
+    positions = rows.index.get_indexer([bond.isin for bond in bonds])
+    if np.any(positions < 0):
+        raise KeyError(bonds[int(np.argmin(positions))].isin)
+    xs, ys, derived = _forward_substitute(rows["Dirty Price"].to_numpy()[positions],
+                                          rows["Coupon Periods"].to_numpy()[positions],
+                                          rows["Maturity Period"].to_numpy()[positions],
+                                          [bond.coupon_payment for bond in bonds],
+                                          [bond.notional for bond in bonds], compounding_period)
+    return BinarySortedDict.from_sorted(xs.tolist(), ys.tolist(), derived.tolist())
+
+
+def _substitution_plan(coupon_periods: list, maturities: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Lays out the lower-triangular system solved by _forward_substitute().
+
+    Every curve write is a variable, numbered in the order bootstrap() makes it:
+    bond i first writes its coupon dates not yet on the curve (derived variables,
+    interpolated from the variables holding their neighbouring keys), then its
+    maturity. So a variable only depends on variables numbered below it. Only keys
+    are needed to find these dependencies, so they are found once, by bisecting a
+    sorted list of keys, and no values are touched.
+
+    Returns (coupon_vars, lo, hi, frac, maturity_vars, keys, key_vars):
+    - coupon_vars: the variable read at each coupon date, bond by bond
+    - lo, hi, frac: for each variable, the neighbours and weight it is interpolated
+        with (lo == hi and frac == 0 past either end; unused for maturities)
+    - maturity_vars: the variable written at each bond's maturity
+    - keys, key_vars: the sorted curve keys and the variable each ends up holding
+    """
+    n_coupons = sum(len(periods) for periods in coupon_periods)
+    lo = np.zeros(n_coupons + len(maturities), dtype=np.int64)
+    hi = np.zeros(n_coupons + len(maturities), dtype=np.int64)
+    frac = np.zeros(n_coupons + len(maturities))
+    coupon_vars = np.zeros(n_coupons, dtype=np.int64)
+    maturity_vars = np.zeros(len(maturities), dtype=np.int64)
+    keys, key_vars, current = [], [], {}
+    v = c = 0
+    for i, (periods, m) in enumerate(zip(coupon_periods, np.asarray(maturities).tolist())):
+        missing = []
+        for day in np.asarray(periods).tolist():
+            var = current.get(day)
+            if var is None:
+                if not keys:
+                    raise ValueError(f"coupon date {day} of bond {i} comes before the first known curve point")
+                j = bisect_right(keys, day)
+                below, above = keys[max(j - 1, 0)], keys[min(j, len(keys) - 1)]
+                lo[v], hi[v] = key_vars[max(j - 1, 0)], key_vars[min(j, len(keys) - 1)]
+                if below < day < above:
+                    frac[v] = (day - below) / (above - below)
+                missing.append((day, v))
+                var = v
+                v += 1
+            coupon_vars[c] = var
+            c += 1
+        for day, var in missing:
+            if day in current:
+                continue
+            j = bisect_right(keys, day)
+            keys.insert(j, day)
+            key_vars.insert(j, var)
+            current[day] = var
+        if m not in current:
+            j = bisect_right(keys, m)
+            keys.insert(j, m)
+            key_vars.insert(j, v)
+        else:
+            key_vars[bisect_right(keys, m) - 1] = v
+        current[m] = v
+        maturity_vars[i] = v
+        v += 1
+    return (coupon_vars, lo[:v], hi[:v], frac[:v], maturity_vars,
+            np.array(keys, dtype=np.int64), np.array(key_vars, dtype=np.int64))
+
+
+def _forward_substitute(prices, all_coupon_periods, maturities, coupon_payments, notionals, compounding_period):
+    """
+    The points (xs, ys) of bootstrap_matrix() for bonds given column by column,
+    and a mask of the derived (interpolated coupon) points.
+    The system laid out by _substitution_plan() is solved by forward substitution
+    over fixed arrays, so nothing is inserted or re-sorted.
+    """
+    if compounding_period == 0:
+        to_discount, to_rate = continuous_time_period, lambda d, t: continuous_yield(d, 1.0, t)
+    elif compounding_period == 1:
+        to_discount, to_rate = annual_time_period, lambda d, t: annual_yield(1.0, d, t)
+    else:
+        raise ValueError("compounding_period must be 0 (continuous) or 1 (annual)")
+    coupon_vars, lo, hi, frac, maturity_vars, keys, key_vars = _substitution_plan(all_coupon_periods, maturities)
+    coupon_offsets = np.zeros(len(all_coupon_periods) + 1, dtype=np.int64)
+    np.cumsum([len(periods) for periods in all_coupon_periods], out=coupon_offsets[1:])
+    coupon_times = np.concatenate([np.asarray(periods, dtype=float) for periods in all_coupon_periods] + [np.zeros(0)]) / 365
+    rates = np.zeros(len(lo))
+    start = 0
+    for i, end in enumerate(maturity_vars.tolist()):
+        if end > start:
+            y0 = rates[lo[start:end]]
+            rates[start:end] = y0 + (rates[hi[start:end]] - y0) * frac[start:end]
+        a, b = coupon_offsets[i], coupon_offsets[i+1]
+        discounted_cf = coupon_payments[i] * to_discount(rates[coupon_vars[a:b]], coupon_times[a:b]).sum()
+        rates[end] = to_rate((prices[i] - discounted_cf) / notionals[i], maturities[i]/365)
+        start = end + 1
+    derived = np.ones(len(lo), dtype=bool)
+    derived[maturity_vars] = False
+    return keys, rates[key_vars], derived[key_vars]
+
+
+def _bootstrap_inputs(bonds, partitions):
+    """
+    Flattens the rows of bonds on each of partitions (frames indexed by ISIN) into
+    arrays for worker processes. Date d's rows are date_offsets[d]:date_offsets[d+1],
+    and row i's coupon periods are periods[offsets[i]:offsets[i+1]].
+    """
+    isins = [bond.isin for bond in bonds]
+    prices, maturities, coupon_periods = [], [], []
+    for rows in partitions:
+        positions = rows.index.get_indexer(isins)
+        if np.any(positions < 0):
+            raise KeyError(isins[int(np.argmin(positions))])
+        prices.append(rows["Dirty Price"].to_numpy(dtype=float)[positions])
+        maturities.append(rows["Maturity Period"].to_numpy(dtype=np.int64)[positions])
+        coupon_periods.extend(rows["Coupon Periods"].to_numpy()[positions])
+    offsets = np.zeros(len(coupon_periods) + 1, dtype=np.int64)
+    np.cumsum([len(periods) for periods in coupon_periods], out=offsets[1:])
+    periods = np.fromiter((p for periods in coupon_periods for p in periods), dtype=np.int64, count=offsets[-1])
+    return {"prices": np.concatenate(prices) if prices else np.zeros(0),
+            "maturities": np.concatenate(maturities) if maturities else np.zeros(0, dtype=np.int64),
+            "coupon_payments": np.tile([bond.coupon_payment for bond in bonds], len(partitions)).astype(float),
+            "notionals": np.tile([bond.notional for bond in bonds], len(partitions)).astype(float),
+            "periods": periods,
+            "offsets": offsets,
+            "date_offsets": np.arange(len(partitions) + 1, dtype=np.int64) * len(bonds)}
+
+
+def _bootstrap_dates(spec, chunk, compounding_period):
+    # Worker for get_all_sr: the (xs, ys, derived) points of each date in chunk
+    curves = []
+    with AttachedArrays(spec) as a:
+        for d in chunk:
+            lo, hi = a["date_offsets"][d], a["date_offsets"][d+1]
+            periods = [a["periods"][a["offsets"][i]:a["offsets"][i+1]] for i in range(lo, hi)]
+            curves.append(_forward_substitute(a["prices"][lo:hi], periods, a["maturities"][lo:hi],
+                                              a["coupon_payments"][lo:hi], a["notionals"][lo:hi],
+                                              compounding_period))
+    return curves
+
+
 def continuous_time_period(r,t):
     return np.exp(-r*t)
 
@@ -176,11 +527,23 @@ def annual_yield(num,den,t):
     return (num/den)**(1/t) - 1
 
 
-def get_all_sr(bonds, df, dates, compounding_period=0):
-    r = []
-    for date in dates:
-        r.append(bootstrap(bonds, df[df["Date Collected"] == date], compounding_period=compounding_period))
-    return r
+def get_all_sr(bonds, df, dates, compounding_period=0, jobs=1, executor=None):
+    """
+    The spot curve of each date, in the order of dates.
+
+    With jobs > 1 (or an executor) the dates are bootstrapped across worker
+    processes with bootstrap_matrix(), reading the bond data from shared memory.
+    """
+    partitions = partition_by_date(df)
+    if jobs == 1 and executor is None:
+        r = []
+        for date in dates:
+            r.append(bootstrap(bonds, partitions[pd.Timestamp(date)], compounding_period=compounding_period))
+        return r
+    arrays = _bootstrap_inputs(bonds, [partitions[pd.Timestamp(date)] for date in dates])
+    curves = map_shared(_bootstrap_dates, arrays, len(dates), (compounding_period,), jobs=jobs, executor=executor)
+    return [BinarySortedDict.from_sorted(xs.tolist(), ys.tolist(), derived.tolist())
+            for xs, ys, derived in curves]
 
 
 def plot_sr(rates, dates, output_folder) -> None:
@@ -197,28 +560,20 @@ def plot_sr(rates, dates, output_folder) -> None:
 #################################
 ### Forward Rate Computations ###
 #################################
-def interpolate_to_years(r):
-    for period in [365*x for x in range(1,6)]:
-        r[period] = r.linearly_interpolate(period)
+def compute_forward_rates(r, start=365, ends=(730, 1095, 1460, 1825)):
+    return get_forward_surface([r], [start], ends)[0, 0].tolist()
 
 
-def compute_forward_rates(r):
-    rates = []
-    initial_period = 365
-    for period in [365*x for x in range(2,6)]:
-        rate = (r[period] * period - r[initial_period] * initial_period)/(period-initial_period)
-        rates.append(rate)
-    return rates
+def get_forward_surface(spots, starts, ends, dates=None):
+    # Forward rates of every curve from each start tenor to each end tenor (days),
+    # as a dates x starts x ends array; NaN where end <= start
+    tenors = np.union1d(starts, ends)
+    return CurveCube.from_curves(spots, dates, tenors).forward_surface(starts, ends)
 
 
 def get_all_fr(spots):
-    forward_vals = []
-    for r in spots:
-        interpolate_to_years(r)
-        print(r)
-        forward_rates = compute_forward_rates(r)
-        forward_vals.append(forward_rates)
-    return forward_vals
+    # The 1 year into 1 to 4 year forward rates of every curve, as a dates x 4 array
+    return CurveCube.from_curves(spots).forward_rates(365)
 
 
 def plot_fr(fr, dates, output_folder):
@@ -236,28 +591,33 @@ def plot_fr(fr, dates, output_folder):
 ### Covariance Matrices Computations ###
 ########################################
 def construct_cov(data, rv_func):
-    num_vars = len(data[0])
-    num_days = len(data)
-    rvs = np.zeros(shape=(num_vars, num_days))
-    for i in range(num_vars):
-        for j in range(num_days-1):
-            rvs[i][j] = rv_func(data[j][i], data[j+1][i])
-    return np.cov(rvs)
+    # data is days x variables; rv_func is applied to whole consecutive-day rows at once
+    data = np.asarray(data, dtype=float)
+    rvs = rv_func(data[:-1], data[1:])
+    return np.cov(rvs, rowvar=False)
+
+
+def get_rolling_pca(data, window, k=3):
+    # data is days x variables, e.g. get_year_srs(sr) or get_all_fr(sr); returns the
+    # eigenvalues, explained variance ratios and loadings of each window of log returns
+    data = np.asarray(data, dtype=float)
+    return RollingPCA(data.shape[1], window, k).run(log_returns(data))
 
 
 def daily_log_returns(val0, val1):
     return np.log(val1/val0)
 
 
-def display_cov_evs(cov):
-    eigvals, eigvecs = np.linalg.eig(cov)
+def display_cov_evs(cov, eigen=None):
+    eigvals, eigvecs = sorted_eigh(cov) if eigen is None else eigen
     trace = np.trace(cov)
     for i in range(len(eigvals)):
         print(f"Eigenvalue {i}: {eigvals[i]} constituting {100*eigvals[i]/trace}% of trace")
-        print(f"Eigenvector: {eigvecs[i]}")
+        print(f"Eigenvector: {eigvecs[:, i]}")
 
-def eval_evec_to_latex(cov):
-    eigvals, eigvecs = np.linalg.eig(cov)
+def eval_evec_to_latex(cov, eigen=None):
+    # eigen can pass in (eigvals, eigvecs) already computed by sorted_eigh
+    eigvals, eigvecs = sorted_eigh(cov) if eigen is None else eigen
     trace = np.trace(cov)
     ret = "\t\t\t\\hline\n\t\t\t"
     for i in range(len(eigvals)):
@@ -277,11 +637,8 @@ def eval_evec_to_latex(cov):
 
 
 def get_year_srs(sr):
-    year_srs = []
-    for day_sr in sr:
-        year_sr = [day_sr[n] for n in [365*x for x in range(1,6)]]
-        year_srs.append(year_sr)
-    return year_srs
+    # The 1 to 5 year spot rates of every curve, as a dates x 5 array
+    return CurveCube.from_curves(sr).rates
 
 
 def matrix_to_latex(m):
@@ -0,0 +1,288 @@
+import numpy as np
+
+
+def log_returns(levels) -> np.ndarray:
+    """
+    Daily log returns of a days x tenors matrix of levels, as a (days-1) x tenors matrix.
+    """
+    levels = np.asarray(levels, dtype=float)
+    return np.log(levels[1:] / levels[:-1])
+
+
+def sorted_eigh(cov) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Eigenvalues of a symmetric matrix in descending order, with the matching
+    eigenvectors as the columns of the second array.
+    """
+    eigvals, eigvecs = np.linalg.eigh(np.asarray(cov, dtype=float))
+    return eigvals[::-1], eigvecs[:, ::-1]
+
+
+class OnlineCovariance:
+    """
+    Running mean and covariance of vector observations (Welford's method).
+
+    Observations can be added one at a time, merged in as a batch, or removed
+    again, so the covariance of a long or rolling history is never recomputed
+    from scratch.
+
+    === Attributes ===
+    - n: the number of observations so far
+    - mean: the mean observation
+    """
+    n: int
+    mean: np.ndarray
+
+    def __init__(self, num_vars: int) -> None:
+        self.n = 0
+        self.mean = np.zeros(num_vars)
+        self._m2 = np.zeros((num_vars, num_vars))
+
+    def add(self, x) -> None:
+        x = np.asarray(x, dtype=float)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += np.outer(delta, x - self.mean)
+
+    def remove(self, x) -> None:
+        """
+        Removes an observation previously added.
+        """
+        x = np.asarray(x, dtype=float)
+        if self.n <= 1:
+            self.n = 0
+            self.mean[:] = 0
+            self._m2[:] = 0
+            return
+        old_mean = (self.n * self.mean - x) / (self.n - 1)
+        self._m2 -= np.outer(x - old_mean, x - self.mean)
+        self.mean = old_mean
+        self.n -= 1
+
+    def replace(self, old, x) -> None:
+        """
+        Removes the observation old, previously added, and adds x in one update,
+        keeping the number of observations the same (e.g. to slide a window).
+        """
+        old = np.asarray(old, dtype=float)
+        x = np.asarray(x, dtype=float)
+        if self.n == 0:
+            raise ValueError("no observation to replace")
+        new_mean = self.mean + (x - old) / self.n
+        self._m2 += np.outer(x - self.mean, x - new_mean) - np.outer(old - self.mean, old - new_mean)
+        self.mean = new_mean
+
+    def add_many(self, xs) -> None:
+        """
+        Adds the rows of xs in one step, merging their mean and covariance in.
+        """
+        xs = np.asarray(xs, dtype=float)
+        m = len(xs)
+        if m == 0:
+            return
+        batch_mean = xs.mean(axis=0)
+        centred = xs - batch_mean
+        n = self.n + m
+        delta = batch_mean - self.mean
+        self._m2 += centred.T @ centred + np.outer(delta, delta) * (self.n * m / n)
+        self.mean += delta * (m / n)
+        self.n = n
+
+    def cov(self, ddof: int = 1) -> np.ndarray:
+        """
+        The covariance matrix, matching np.cov on the observations (rows as samples).
+        """
+        if self.n <= ddof:
+            return np.full(self._m2.shape, np.nan)
+        m2 = (self._m2 + self._m2.T) / 2
+        return m2 / (self.n - ddof)
+
+    def eigen(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The principal components of the covariance, from sorted_eigh.
+        """
+        return sorted_eigh(self.cov())
+
+
+class LogReturnCovariance(OnlineCovariance):
+    """
+    An OnlineCovariance of daily log returns, fed one day's curve levels at a time.
+
+    === Attributes ===
+    - last: the most recent levels added, or None before the first day
+    """
+    last: np.ndarray | None
+
+    def __init__(self, num_vars: int) -> None:
+        super().__init__(num_vars)
+        self.last = None
+
+    def add_day(self, levels) -> None:
+        """
+        Adds the log return from the previous day's levels to levels.
+        """
+        levels = np.asarray(levels, dtype=float)
+        if self.last is not None:
+            self.add(np.log(levels / self.last))
+        self.last = levels
+
+
+def subspace_iteration(cov, start, k: int = None, tol: float = 1e-8,
+                       max_iter: int = 100) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    Leading eigenpairs of a symmetric matrix by subspace iteration with a
+    Rayleigh-Ritz step, starting from the columns of start (e.g. the previous
+    window's eigenvectors, which are already close).
+
+    Iterates until the first k pairs (all of them by default) have residuals
+    |cov v - lambda v| within tol times the largest eigenvalue. Extra columns
+    beyond k act as guard vectors and speed up convergence of the first k.
+
+    Returns (eigenvalues in descending order, eigenvectors as columns, iterations),
+    one pair per column of start. Columns keep the sign of the matching start
+    column, so loadings do not flip between windows.
+    """
+    cov = np.asarray(cov, dtype=float)
+    k = start.shape[1] if k is None else k
+    q, _ = np.linalg.qr(start)
+    for iteration in range(1, max_iter + 1):
+        z = cov @ q
+        eigvals, rotation = np.linalg.eigh(q.T @ z)
+        eigvals, rotation = eigvals[::-1], rotation[:, ::-1]
+        q, z = q @ rotation, z @ rotation
+        residuals = np.linalg.norm(z[:, :k] - q[:, :k] * eigvals[:k], axis=0)
+        if np.all(residuals <= tol * max(abs(eigvals[0]), np.finfo(float).tiny)):
+            break
+        q, _ = np.linalg.qr(z)
+    signs = np.sign(np.sum(q * start, axis=0))
+    signs[signs == 0] = 1
+    return eigvals, q * signs, iteration
+
+
+class RollingPCA:
+    """
+    Principal components of a rolling window of observations (e.g. daily log
+    returns of spot or forward rates).
+
+    Each step slides the window of an OnlineCovariance by one observation with
+    a single rank-two update, rather than recomputing the window's covariance.
+    The principal components of the updated covariance come from a full
+    decomposition when there are few variables, where that is cheapest. With
+    many variables (over SUBSPACE_RATIO times the k + oversample vectors
+    tracked) the previous window's eigenvectors are refined by a few subspace
+    iterations instead; the extra oversample vectors make the top k converge
+    in fewer iterations. Either way, loadings keep the sign of the previous
+    window's, so they do not flip between windows.
+
+    === Attributes ===
+    - window: the number of observations in each window
+    - k: the number of principal components tracked
+    - cov: the running covariance of the current window
+    - iterations: the subspace iterations used by each window after the first,
+        empty when full decompositions are used
+    """
+    # Measured crossover (60-day windows): up to this many variables per
+    # tracked vector, a full eigh is faster than warm-started subspace iteration.
+    SUBSPACE_RATIO = 8
+
+    window: int
+    k: int
+    cov: OnlineCovariance
+    iterations: list[int]
+
+    def __init__(self, num_vars: int, window: int, k: int = 3, oversample: int = None,
+                 tol: float = 1e-8, max_iter: int = 100) -> None:
+        if window < 2:
+            raise ValueError("window must hold at least two observations")
+        self.window = window
+        self.k = min(k, num_vars)
+        self.cov = OnlineCovariance(num_vars)
+        self.iterations = []
+        self._block = min(num_vars, self.k + (self.k if oversample is None else oversample))
+        self._iterate = num_vars > self.SUBSPACE_RATIO * self._block
+        self._tol = tol
+        self._max_iter = max_iter
+        self._buffer = np.empty((window, num_vars))
+        self._count = 0
+        self._vecs = None
+
+    def push(self, x) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+        """
+        Adds an observation. Once the window is full, returns the window's
+        (eigenvalues, explained variance ratios, loadings as columns); before
+        that returns None.
+        """
+        x = np.asarray(x, dtype=float)
+        slot = self._count % self.window
+        if self._count < self.window:
+            self.cov.add(x)
+        else:
+            self.cov.replace(self._buffer[slot], x)
+        self._buffer[slot] = x
+        self._count += 1
+        if self._count < self.window:
+            return None
+        cov = self.cov.cov()
+        if self._vecs is not None and self._iterate:
+            eigvals, self._vecs, iterations = subspace_iteration(cov, self._vecs, self.k, self._tol, self._max_iter)
+            self.iterations.append(iterations)
+        else:
+            eigvals, eigvecs = sorted_eigh(cov)
+            eigvals, eigvecs = eigvals[:self._block], eigvecs[:, :self._block]
+            if self._vecs is not None:
+                signs = np.sign(np.sum(eigvecs * self._vecs, axis=0))
+                signs[signs == 0] = 1
+                eigvecs = eigvecs * signs
+            self._vecs = eigvecs
+        return eigvals[:self.k], eigvals[:self.k] / np.trace(cov), self._vecs[:, :self.k].copy()
+
+    def run(self, xs, chunk: int = 256) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pushes every row of xs and stacks the results of each full window:
+        eigenvalues and explained variance ratios of shape (windows, k), and
+        loadings of shape (windows, num_vars, k).
+
+        On a new RollingPCA with few variables, the windows are computed in
+        batches of chunk instead: every window's covariance comes from prefix
+        sums of the observations and their outer products, and all of them are
+        decomposed by one batched eigh. The state afterwards is the same as if
+        every row had been pushed.
+        """
+        xs = np.asarray(xs, dtype=float)
+        n = len(self.cov.mean)
+        if self._count == 0 and not self._iterate and len(xs) >= self.window:
+            return self._run_batch(xs, chunk)
+        results = [r for r in (self.push(x) for x in xs) if r is not None]
+        if not results:
+            return np.zeros((0, self.k)), np.zeros((0, self.k)), np.zeros((0, n, self.k))
+        eigvals, explained, loadings = zip(*results)
+        return np.array(eigvals), np.array(explained), np.array(loadings)
+
+    def _run_batch(self, xs: np.ndarray, chunk: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        w, b = self.window, self._block
+        num_windows = len(xs) - w + 1
+        # Centring first keeps the prefix sums small, so differences of them stay accurate.
+        centred = xs - xs.mean(axis=0)
+        eigvals, traces, eigvecs = [], [], []
+        for start in range(0, num_windows, chunk):
+            rows = centred[start:min(start + chunk, num_windows) + w - 1]
+            sums = np.zeros((len(rows) + 1,) + rows.shape[1:])
+            np.cumsum(rows, axis=0, out=sums[1:])
+            products = np.zeros((len(rows) + 1,) + rows.shape[1:] * 2)
+            np.cumsum(rows[:, :, None] * rows[:, None, :], axis=0, out=products[1:])
+            s1 = sums[w:] - sums[:-w]
+            covs = (products[w:] - products[:-w] - s1[:, :, None] * s1[:, None, :] / w) / (w - 1)
+            vals, vecs = np.linalg.eigh(covs)
+            eigvals.append(vals[:, :-b-1:-1])
+            eigvecs.append(vecs[:, :, :-b-1:-1])
+            traces.append(np.trace(covs, axis1=1, axis2=2))
+        eigvals, traces, eigvecs = (np.concatenate(a) for a in (eigvals, traces, eigvecs))
+        signs = np.sign(np.sum(eigvecs[1:] * eigvecs[:-1], axis=1))
+        signs[signs == 0] = 1
+        eigvecs[1:] *= np.cumprod(signs, axis=0)[:, None, :]
+        self.cov.add_many(xs[-w:])
+        self._buffer[np.arange(len(xs) - w, len(xs)) % w] = xs[-w:]
+        self._count = len(xs)
+        self._vecs = eigvecs[-1]
+        return eigvals[:, :self.k], eigvals[:, :self.k] / traces[:, None], eigvecs[:, :, :self.k]
@@ -0,0 +1,100 @@
+import numpy as np
+from itertools import repeat
+from multiprocessing import shared_memory
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+
+class SharedArrays:
+    """
+    NumPy arrays copied into shared memory so worker processes can read them
+    without pickling. Use as a context manager; the memory is released on exit.
+
+    === Attributes ===
+    - spec: a small picklable description of the arrays to hand to workers,
+        mapping each name to (block name, shape, dtype)
+    """
+    spec: dict
+
+    def __init__(self, arrays: dict[str, np.ndarray]) -> None:
+        self.spec = {}
+        self._blocks = []
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._blocks.append(block)
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self.spec[key] = (block.name, array.shape, array.dtype.str)
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> 'SharedArrays':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class AttachedArrays:
+    """
+    Opens the arrays described by a SharedArrays spec inside a worker process.
+    Use as a context manager; the arrays are read-only and only valid inside it.
+    """
+    def __init__(self, spec: dict) -> None:
+        self._spec = spec
+        self._blocks = []
+        self.arrays = {}
+
+    def __enter__(self) -> dict[str, np.ndarray]:
+        for key, (name, shape, dtype) in self._spec.items():
+            # Workers started by multiprocessing share the creator's resource
+            # tracker, so the memory is unlinked once, by SharedArrays.close().
+            block = shared_memory.SharedMemory(name=name)
+            self._blocks.append(block)
+            array = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+            array.flags.writeable = False
+            self.arrays[key] = array
+        return self.arrays
+
+    def __exit__(self, *args) -> None:
+        self.arrays.clear()
+        for block in self._blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass  # a caller still holds a view; the mapping goes with the process
+        self._blocks = []
+
+
+def map_shared(func: callable, arrays: dict[str, np.ndarray], n: int, args: tuple = (),
+               jobs: int = 1, executor: Executor | None = None, chunks_per_job: int = 4) -> list:
+    """
+    Runs func over range(n) in chunks across worker processes and returns the
+    results in order.
+
+    func is called as func(spec, chunk, *args), where spec describes arrays
+    (open it with AttachedArrays) and chunk is an array of indices. It must be a
+    module-level function returning one result per index in chunk.
+
+    === Parameters ===
+    - func: the worker function
+    - arrays: the inputs to share with every worker
+    - n: the number of items to split into chunks
+    - args: extra picklable arguments for func
+    - jobs: the number of worker processes to start if executor is None
+    - executor: an existing executor to run the chunks on
+    - chunks_per_job: chunks per worker, so uneven chunks still balance
+    """
+    chunks = [c for c in np.array_split(np.arange(n), max(jobs, 1) * chunks_per_job) if len(c)]
+    with SharedArrays(arrays) as shared:
+        specs = repeat(shared.spec, len(chunks))
+        extra = [repeat(arg, len(chunks)) for arg in args]
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(func, specs, chunks, *extra))
+        else:
+            results = list(executor.map(func, specs, chunks, *extra))
+    return [item for chunk in results for item in chunk]
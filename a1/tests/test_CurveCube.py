@@ -0,0 +1,77 @@
+import os
+import sys
+test_directory = os.path.dirname(__file__)
+src_dir = os.path.join(test_directory, '..', 'src')
+sys.path.append(src_dir)
+import CurveCube as src
+import BinarySortedDict as bsd
+import numpy as np
+TOL = 1e-12
+
+def make_curves():
+    curves = []
+    for shift in [0.0, 0.001, 0.002]:
+        curve = bsd.BinarySortedDict()
+        curve[180] = 0.040 + shift
+        curve[700] = 0.035 + shift
+        curve[1900] = 0.032 + shift
+        curves.append(curve)
+    return curves
+
+def test_from_curves():
+    curves = make_curves()
+    cube = src.CurveCube.from_curves(curves, ["2024-01-08", "2024-01-09", "2024-01-10"])
+    assert cube.rates.shape == (3, 5)
+    assert cube.dates[1] == np.datetime64("2024-01-09")
+    for row, curve in zip(cube.rates, curves):
+        assert np.allclose(row, curve.linearly_interpolate_many(src.YEARLY_TENORS), atol=TOL)
+    assert len(curves[0]) == 3
+
+def test_forward_rates():
+    cube = src.CurveCube.from_curves(make_curves())
+    fr = cube.forward_rates(365)
+    assert fr.shape == (3, 4)
+    r = cube.rates
+    for k, end in enumerate([730, 1095, 1460, 1825]):
+        expected = (r[:, k+1] * end - r[:, 0] * 365) / (end - 365)
+        assert np.allclose(fr[:, k], expected, atol=TOL)
+
+def test_returns_and_cov():
+    cube = src.CurveCube.from_curves(make_curves())
+    returns = cube.log_returns()
+    assert returns.shape == (2, 5)
+    assert np.allclose(cube.cov(), np.cov(returns, rowvar=False), atol=TOL)
+
+def test_save_load(tmp_path):
+    cube = src.CurveCube.from_curves(make_curves(), ["2024-01-08", "2024-01-09", "2024-01-10"])
+    cube.save(str(tmp_path / "cube"))
+    loaded = src.CurveCube.load(str(tmp_path / "cube"))
+    assert isinstance(loaded.rates, np.memmap)
+    assert np.array_equal(loaded.rates, cube.rates)
+    assert np.array_equal(loaded.dates, cube.dates) and np.array_equal(loaded.tenors, cube.tenors)
+
+def test_interpolate_stacked():
+    curves = make_curves() + [bsd.BinarySortedDict()]
+    curves[1][1000] = 0.05
+    tenors = [0, 180, 365, 700, 1000, 1500, 1900, 2500]
+    result = src.interpolate_stacked(*src.stack_curves(curves), tenors)
+    for row, curve in zip(result[:3], curves):
+        assert np.allclose(row, curve.linearly_interpolate_many(tenors), atol=TOL)
+    assert np.all(np.isnan(result[3]))
+
+def test_forward_surface():
+    curves = make_curves()
+    starts = np.array([180, 365, 730])
+    ends = np.array([365, 730, 1825])
+    tenors = np.union1d(starts, ends)
+    cube = src.CurveCube.from_curves(curves, tenors=tenors)
+    surface = cube.forward_surface(starts, ends)
+    assert surface.shape == (3, 3, 3)
+    for d, curve in enumerate(curves):
+        for i, start in enumerate(starts):
+            for j, end in enumerate(ends):
+                if end <= start:
+                    assert np.isnan(surface[d, i, j])
+                else:
+                    expected = (curve.linearly_interpolate(end) * end - curve.linearly_interpolate(start) * start) / (end - start)
+                    assert abs(surface[d, i, j] - expected) < TOL
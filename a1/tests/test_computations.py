@@ -0,0 +1,67 @@
+import os
+import sys
+test_directory = os.path.dirname(__file__)
+root_dir = os.path.join(test_directory, '..')
+sys.path.append(root_dir)
+import src.computations as src
+import numpy as np
+import pandas as pd
+import pytest
+TOL = 1e-12
+
+def make_rows():
+    periods = [[], [139, 324, 505, 689], [182, 365, 547, 730, 912, 1095, 1277, 1460, 1642]]
+    maturities = [140, 874, 1825]
+    bonds = [src.Bond(isin, 100.0, coupon, maturity, coupon_periods) for isin, coupon, maturity, coupon_periods
+             in zip(["A1", "A2", "A3"], [0.01, 0.0175, 0.04], maturities, periods)]
+    df = pd.DataFrame({"ISIN": [b.isin for b in bonds],
+                       "Date Collected": pd.to_datetime(["2024-01-08"] * 3),
+                       "Coupon Periods": periods,
+                       "Maturity Period": maturities,
+                       "Dirty Price": [100.2, 98.1, 103.5]})
+    return bonds, df
+
+def test_batch_matches_scalar():
+    bonds, df = make_rows()
+    times, amounts = src.cashflow_matrices(bonds, df)
+    ytm, iterations, converged = src.batch_newton_raphson_ytm(times, amounts, df["Dirty Price"].to_numpy())
+    assert converged.all() and np.all(iterations > 0)
+    rows = zip(bonds, df["Dirty Price"], df["Coupon Periods"], df["Maturity Period"], ytm)
+    for bond, price, coupon_periods, maturity_period, y in rows:
+        assert abs(y - src.newton_raphson_ytm(price, coupon_periods, maturity_period, bond)) < TOL
+
+def test_batch_reports_unconverged(capsys):
+    bonds, df = make_rows()
+    times, amounts = src.cashflow_matrices(bonds, df)
+    _, iterations, converged = src.batch_newton_raphson_ytm(times, amounts, df["Dirty Price"].to_numpy(), num_iter=1)
+    assert not converged.any() and np.all(iterations == 1)
+    df.loc[2, "Dirty Price"] = 1e-300
+    src.compute_ytm(bonds, df)
+    assert capsys.readouterr().out.count("Max number of iterations reached.") == 1
+
+def test_batch_flags_diverged(capsys):
+    bonds, df = make_rows()
+    times, amounts = src.cashflow_matrices(bonds, df)
+    amounts[1] = 0
+    ytm, _, converged = src.batch_newton_raphson_ytm(times, amounts, df["Dirty Price"].to_numpy())
+    assert list(converged) == [True, False, True] and np.isnan(ytm[1])
+    bonds[1] = src.Bond("A2", 0.0, 0.0175, 874, [139, 324, 505, 689])
+    src.compute_ytm(bonds, df)
+    out = capsys.readouterr().out
+    assert out.count("Newton-Raphson diverged.") == 1 and "Max number of iterations reached." not in out
+
+def test_bootstrap_matrix_matches_bootstrap():
+    bonds, df = make_rows()
+    expected = src.bootstrap(bonds, df)
+    result = src.bootstrap_matrix(bonds, df)
+    exp_x, exp_y = expected.sorted_key_vals()
+    result_x, result_y = result.sorted_key_vals()
+    assert result_x == exp_x and result.derived == expected.derived
+    assert np.allclose(result_y, exp_y, rtol=0, atol=TOL)
+    with pytest.raises(ValueError):
+        src.bootstrap_matrix(bonds[1:], df)
+
+def test_cashflow_matrices_unknown_isin():
+    bonds, df = make_rows()
+    with pytest.raises(ValueError):
+        src.cashflow_matrices(bonds[:2], df)
@@ -0,0 +1,114 @@
+import os
+import sys
+test_directory = os.path.dirname(__file__)
+src_dir = os.path.join(test_directory, '..', 'src')
+sys.path.append(src_dir)
+import covariance as src
+import numpy as np
+TOL = 1e-12
+
+def test_log_returns():
+    levels = np.array([[1.0, 2.0], [1.1, 1.8], [1.21, 1.98]])
+    expected = np.log(levels[1:] / levels[:-1])
+    assert np.allclose(src.log_returns(levels), expected, atol=TOL)
+
+def test_online_covariance():
+    rng = np.random.default_rng(0)
+    xs = rng.normal(size=(50, 4))
+    online = src.OnlineCovariance(4)
+    for x in xs:
+        online.add(x)
+    assert online.n == 50
+    assert np.allclose(online.cov(), np.cov(xs, rowvar=False), atol=TOL)
+    for x in xs[:10]:
+        online.remove(x)
+    assert np.allclose(online.mean, xs[10:].mean(axis=0), atol=TOL)
+    assert np.allclose(online.cov(), np.cov(xs[10:], rowvar=False), atol=TOL)
+    for x, new in zip(xs[10:20], xs[:10]):
+        online.replace(x, new)
+    assert np.allclose(online.cov(), np.cov(np.vstack([xs[20:], xs[:10]]), rowvar=False), atol=TOL)
+    merged = src.OnlineCovariance(4)
+    merged.add_many(xs[:20])
+    merged.add_many(xs[20:])
+    assert np.allclose(merged.cov(), np.cov(xs, rowvar=False), atol=TOL)
+
+def test_log_return_covariance():
+    rng = np.random.default_rng(1)
+    levels = np.exp(np.cumsum(rng.normal(scale=0.01, size=(30, 3)), axis=0)) * 0.04
+    online = src.LogReturnCovariance(3)
+    for day in levels:
+        online.add_day(day)
+    assert online.n == 29
+    assert np.allclose(online.cov(), np.cov(src.log_returns(levels), rowvar=False), atol=TOL)
+
+def test_sorted_eigh():
+    cov = np.array([[2.0, 0.5, 0.0], [0.5, 1.0, 0.2], [0.0, 0.2, 3.0]])
+    eigvals, eigvecs = src.sorted_eigh(cov)
+    assert np.all(np.diff(eigvals) <= 0)
+    assert np.allclose(cov @ eigvecs, eigvecs * eigvals, atol=TOL)
+
+def test_subspace_iteration():
+    rng = np.random.default_rng(2)
+    a = rng.normal(size=(6, 6))
+    cov = a @ a.T
+    eigvals, eigvecs = src.sorted_eigh(cov)
+    start = eigvecs[:, :2] + 0.05 * rng.normal(size=(6, 2))
+    vals, vecs, _ = src.subspace_iteration(cov, start)
+    assert np.allclose(vals, eigvals[:2], rtol=1e-8)
+    assert np.allclose(np.abs(vecs.T @ eigvecs[:, :2]), np.eye(2), atol=1e-6)
+
+def test_rolling_pca():
+    rng = np.random.default_rng(3)
+    mix = rng.normal(size=(4, 4))
+    xs = rng.normal(size=(80, 4)) @ mix
+    window = 30
+    eigvals, explained, loadings = src.RollingPCA(4, window, k=2).run(xs)
+    assert eigvals.shape == (80 - window + 1, 2) and loadings.shape == (80 - window + 1, 4, 2)
+    for i in [0, 17, 50]:
+        cov = np.cov(xs[i:i+window], rowvar=False)
+        expected_vals, expected_vecs = src.sorted_eigh(cov)
+        assert np.allclose(eigvals[i], expected_vals[:2], rtol=1e-6)
+        assert np.allclose(explained[i], expected_vals[:2] / np.trace(cov), rtol=1e-6)
+        assert np.allclose(np.abs(np.sum(loadings[i] * expected_vecs[:, :2], axis=0)), 1, atol=1e-5)
+    assert np.all(np.sum(loadings[1:] * loadings[:-1], axis=1) > 0)
+
+def factor_returns(days, num_vars, seed):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(days, 3)) * [3.0, 1.5, 0.7]
+    return factors @ rng.normal(size=(3, num_vars)) + 0.3 * rng.normal(size=(days, num_vars))
+
+def test_rolling_pca_push_matches_run():
+    xs = factor_returns(200, 5, 4)
+    batch = src.RollingPCA(5, 40, k=3)
+    eigvals, explained, loadings = batch.run(xs[:150])
+    pushed = src.RollingPCA(5, 40, k=3)
+    results = [r for r in (pushed.push(x) for x in xs[:150]) if r is not None]
+    assert np.allclose(eigvals, [r[0] for r in results], rtol=1e-9)
+    assert np.allclose(explained, [r[1] for r in results], rtol=1e-9)
+    assert np.allclose(loadings, [r[2] for r in results], atol=1e-7)
+    for x in xs[150:]:
+        a, b = batch.push(x), pushed.push(x)
+        assert np.allclose(a[0], b[0], rtol=1e-9) and np.allclose(a[2], b[2], atol=1e-7)
+
+def test_rolling_pca_subspace():
+    xs = factor_returns(120, 60, 5)
+    window = 40
+    pca = src.RollingPCA(60, window, k=3)
+    eigvals, explained, loadings = pca.run(xs)
+    assert len(pca.iterations) == len(xs) - window
+    for i in [0, 33, 80]:
+        expected_vals, expected_vecs = src.sorted_eigh(np.cov(xs[i:i+window], rowvar=False))
+        assert np.allclose(eigvals[i], expected_vals[:3], rtol=1e-6)
+        assert np.allclose(np.abs(np.sum(loadings[i] * expected_vecs[:, :3], axis=0)), 1, atol=1e-5)
+    assert np.all(np.sum(loadings[1:] * loadings[:-1], axis=1) > 0)
+
+def test_rolling_pca_matches_every_window():
+    xs = factor_returns(400, 5, 6)
+    window = 60
+    eigvals, explained, loadings = src.RollingPCA(5, window, k=3).run(xs)
+    for i in range(len(xs) - window + 1):
+        cov = np.cov(xs[i:i+window], rowvar=False)
+        expected_vals, expected_vecs = src.sorted_eigh(cov)
+        assert np.allclose(eigvals[i], expected_vals[:3], rtol=1e-6)
+        assert np.allclose(explained[i], expected_vals[:3] / np.trace(cov), rtol=1e-6)
+        assert np.allclose(np.abs(np.sum(loadings[i] * expected_vecs[:, :3], axis=0)), 1, atol=1e-5)
@@ -0,0 +1,40 @@
+import os
+import ast
+import pytest
+test_directory = os.path.dirname(__file__)
+a1_dir = os.path.join(test_directory, '..')
+a2_dir = os.path.join(a1_dir, '..', 'a2')
+
+# Modules each assignment keeps its own copy of, so both run on their own.
+SHARED_FILES = [("src/parallel.py", "src/Parallel/parallel.py"),
+                ("src/DataCache.py", "src/DataCache/DataCache.py"),
+                ("src/BinarySortedDict.py", "src/BinarySortedDict/BinarySortedDict.py")]
+SHARED_FUNCTIONS = [("src/computations.py", "src/FinancialInstruments/Bond.py",
+                     ["coupon_schedules", "offset_coupon_schedules"]),
+                    ("src/computations.py", "src/Bootstrapper/bootstrap.py", ["_substitution_plan"])]
+
+def read(*path):
+    with open(os.path.join(*path)) as f:
+        return f.read()
+
+def function_sources(source, names):
+    tree = ast.parse(source)
+    return {node.name: ast.get_source_segment(source, node) for node in tree.body
+            if isinstance(node, ast.FunctionDef) and node.name in names}
+
+@pytest.fixture
+def require_a2():
+    if not os.path.isdir(a2_dir):
+        pytest.skip("a2 is not checked out next to a1")
+
+@pytest.mark.parametrize("a1_path, a2_path", SHARED_FILES)
+def test_shared_files_match(require_a2, a1_path, a2_path):
+    # The only intended difference: a1 raises KeyError for missing keys, a2 interpolates them
+    a1 = read(a1_dir, a1_path).replace("INTERPOLATE_MISSING = False", "INTERPOLATE_MISSING = True")
+    assert a1 == read(a2_dir, a2_path)
+
+@pytest.mark.parametrize("a1_path, a2_path, names", SHARED_FUNCTIONS)
+def test_shared_functions_match(require_a2, a1_path, a2_path, names):
+    a1 = function_sources(read(a1_dir, a1_path), names)
+    a2 = function_sources(read(a2_dir, a2_path), names)
+    assert sorted(a1) == sorted(names) and a1 == a2
@@ -1,15 +1,18 @@
 from src.Bootstrapper.bootstrap import bootstrap
-from src.FinancialInstruments.Bond import get_dated_bonds, process_bond_data, sort_bond_list, compute_spread
+from src.FinancialInstruments.Bond import get_dated_bonds, process_bond_data, sort_bond_list, compute_spread, YTMCache
 from src.FinancialInstruments.Stock import DatedStock
 from src.FinancialEntity.Company import Company, StockCompany
 from src.FinancialModels.FinancialModel import MertonModel, CreditMetricsModel
 import numpy as np
 import matplotlib.pyplot as plt
 
+CACHE_DIR = "cache/"
+
 
 def construct_canada() -> Company:
     gov_bonds = get_dated_bonds(process_bond_data("data/gov_bond_info.csv",
-                                                  "data/gov_bond_prices.csv"))
+                                                  "data/gov_bond_prices.csv",
+                                                  cache_dir=CACHE_DIR))
     canada = Company("Canada", gov_bonds)
     canada.compute_rates()
     return canada
@@ -19,19 +22,19 @@ def construct_brookfield() -> StockCompany:
     num_shares = 287.053
     stock_price = 30.34
     bonds = get_dated_bonds(process_bond_data("data/brookfield_bond_info.csv",
-                                                     "data/brookfield_bond_prices.csv"))
+                                              "data/brookfield_bond_prices.csv",
+                                              cache_dir=CACHE_DIR))
     stock = DatedStock(num_shares, "04-10-2024", stock_price)
-    stock.compute_volatility("data/bepun_stock_prices.csv")
+    stock.compute_volatility("data/bepun_stock_prices.csv", cache_dir=CACHE_DIR)
     equity = stock.num_shares * stock.price
     debt = 25222
     c = StockCompany("BEP", bonds, stock, equity+debt, equity, debt)
     return c
 
 
-def merton_experiment(num_years: int, com_constructor: callable) -> list[float]:
+def merton_experiment(num_years: int, canada: Company, com_constructor: callable) -> list[float]:
     print("=== MERTON ===")
     ### SETUP
-    canada = construct_canada()
     company  = com_constructor()
 
     ### Merton Specific Results
@@ -43,14 +46,14 @@ def merton_experiment(num_years: int, com_constructor: callable) -> list[float]:
     return default_probs
 
 
-def credit_metrics_experiment(num_years: int, com_constructor: callable) -> list[float]:
+def credit_metrics_experiment(num_years: int, canada: Company, com_constructor: callable,
+                              ytm_cache: YTMCache | None = None) -> list[float]:
     print("=== CREDIT METRICS ===")
     ### SETUP
-    canada = construct_canada()
     company = com_constructor()
     company.set_recovery_rate(0.5)
 
-    cm = CreditMetricsModel(canada, company)
+    cm = CreditMetricsModel(canada, company, cache=ytm_cache)
 
     ### Credit Metric Specific Results
     cm.print_stats()
@@ -76,9 +79,12 @@ if __name__ == "__main__":
     com_constructor = construct_brookfield
     num_years = 20
     periods = [i for i in range(1, num_years+1)]
-    mm_default_probs = merton_experiment(num_years, com_constructor)
+    canada = construct_canada()
+    # Shared by every CreditMetrics model built on canada, so its yields are solved once
+    ytm_cache = YTMCache()
+    mm_default_probs = merton_experiment(num_years, canada, com_constructor)
     print("")
-    cm_default_probs = credit_metrics_experiment(num_years, com_constructor)
+    cm_default_probs = credit_metrics_experiment(num_years, canada, com_constructor, ytm_cache)
 
     ### Display results
     print("\n=== RESULTS ===")
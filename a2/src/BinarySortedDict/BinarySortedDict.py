@@ -1,5 +1,58 @@
 from typing import Type, Optional
+from bisect import bisect_left, bisect_right
+import numpy as np
+
+# Whether reading a key that is not stored interpolates it (True) or raises KeyError (False).
+INTERPOLATE_MISSING = True
+
+
+def interpolate_sorted(xs: np.ndarray, ys: np.ndarray, keys) -> np.ndarray:
+    """
+    Linearly interpolates ys at every key in one searchsorted pass.
+
+    Keys outside [xs[0], xs[-1]] take the nearest end value (flat extrapolation),
+    matching BinarySortedDict.linearly_interpolate.
+
+    === Prerequisites ===
+    - xs is sorted in ascending order and has no duplicates
+    """
+    keys = np.asarray(keys, dtype=float)
+    if len(xs) == 0:
+        return np.full(keys.shape, np.nan)
+    k = np.clip(keys, xs[0], xs[-1])
+    i = np.searchsorted(xs, k)
+    hit = xs[i] == k
+    lo = np.maximum(i - 1, 0)
+    dx = np.where(hit, 1.0, xs[i] - xs[lo])
+    y0 = ys[lo]
+    return np.where(hit, ys[i], y0 + (ys[i] - y0) * (k - xs[lo]) / dx)
+
+
+def _lookup_sorted(xs: np.ndarray, ys: np.ndarray, keys) -> np.ndarray:
+    """
+    Returns the ys stored at every key, raising KeyError for the first missing key.
+    """
+    keys = np.asarray(keys, dtype=float)
+    if len(xs) == 0:
+        if keys.size:
+            raise KeyError(keys.ravel()[0])
+        return np.empty(keys.shape)
+    i = np.minimum(np.searchsorted(xs, keys), len(xs) - 1)
+    missing = xs[i] != keys
+    if np.any(missing):
+        raise KeyError(keys[missing].ravel()[0])
+    return ys[i]
+
+
 class BinarySearchTree:
+    """
+    An unbalanced binary search tree of keys.
+
+    BinarySortedDict indexes its keys with SortedKeyIndex, which stays balanced;
+    this tree is kept for callers that build one directly. Every operation walks
+    the tree iteratively, so a degenerate (linked-list shaped) tree of any depth
+    does not hit the recursion limit.
+    """
     _root: Optional[int]
     _left: Optional['BinarySearchTree']
     _right: Optional['BinarySearchTree']
@@ -17,41 +70,52 @@ class BinarySearchTree:
         return self._root is None
 
     def __eq__(self, bst: Type['BinarySearchTree']):
-        if self._root != bst._root:
-            return False
-        if self._left != bst._left:
-            return False
-        if self._right != bst._right:
-            return False
+        stack = [(self, bst)]
+        while stack:
+            a, b = stack.pop()
+            if a is None or b is None:
+                if a is not b:
+                    return False
+                continue
+            if a._root != b._root:
+                return False
+            stack.append((a._left, b._left))
+            stack.append((a._right, b._right))
         return True
 
     def in_order_traversal(self):
         result = []
-        if not self.is_empty():
-            result.extend(self._left.in_order_traversal())
-            result.append(self._root)
-            result.extend(self._right.in_order_traversal())
+        stack = []
+        current = self
+        while stack or not current.is_empty():
+            while not current.is_empty():
+                stack.append(current)
+                current = current._left
+            current = stack.pop()
+            result.append(current._root)
+            current = current._right
         return result
 
     def __iter__(self):
         return iter(self.in_order_traversal())
 
     def insert(self, val):
-        if self._root is None:
-            self._root = val
-            self._left = BinarySearchTree()
-            self._right = BinarySearchTree()
-        elif val < self._root:
-            self._left.insert(val)
-        elif val > self._root:
-            self._right.insert(val)
-        else:
-            self._key = val
+        current = self
+        while not current.is_empty():
+            if val < current._root:
+                current = current._left
+            elif val > current._root:
+                current = current._right
+            else:
+                return
+        current._root = val
+        current._left = BinarySearchTree()
+        current._right = BinarySearchTree()
 
     def get_closest_below(self, item):
         closest = None
         current = self
-        while current._root:
+        while not current.is_empty():
             if current._root < item:
                 closest = current._root
                 current = current._right
@@ -62,7 +126,7 @@ class BinarySearchTree:
     def get_closest_above(self, item):
         closest = None
         current = self
-        while current._root:
+        while not current.is_empty():
             if current._root > item:
                 closest = current._root
                 current = current._left
@@ -71,13 +135,13 @@ class BinarySearchTree:
         return closest
 
     def _extract_max(self):
-        if self._right.is_empty():
-            max_item = self._root
-            self._root, self._left, self._right = \
-                self._left._root, self._left._left, self._left._right
-            return max_item
-        else:
-            return self._right._extract_max()
+        current = self
+        while not current._right.is_empty():
+            current = current._right
+        max_item = current._root
+        current._root, current._left, current._right = \
+            current._left._root, current._left._left, current._left._right
+        return max_item
 
     def _delete_root(self):
         if self._left.is_empty() and self._right.is_empty():
@@ -85,33 +149,105 @@ class BinarySearchTree:
             self._left = None
             self._right = None
         elif self._left.is_empty():
-            self._root = self._right._root
-            self._left = self._right._left
-            self._right = self._right._right
+            self._root, self._left, self._right = \
+                self._right._root, self._right._left, self._right._right
         elif self._right.is_empty():
-            self._root = self._left._root
-            self._left = self._left._left
-            self._right = self._left._right
+            self._root, self._left, self._right = \
+                self._left._root, self._left._left, self._left._right
         else:
             self._root = self._left._extract_max()
 
     def delete(self, item):
-        if self.is_empty():
-            pass
-        elif self._root == item:
-            self._delete_root()
-        elif item < self._root:
-            self._left.delete(item)
-        else:
-            self._right.delete(item)
+        current = self
+        while not current.is_empty():
+            if current._root == item:
+                current._delete_root()
+                return
+            current = current._left if item < current._root else current._right
+
+
+class SortedKeyIndex:
+    """
+    A sorted array of keys searched by bisection.
+
+    Offers the same operations as BinarySearchTree, but stays balanced no matter
+    the insertion order (bootstrapping inserts maturities in ascending order, which
+    degrades an unbalanced tree into a linked list). Searches are O(log n) and
+    inserts/deletes are a single memmove.
+    """
+    _keys: list
+
+    def __init__(self, keys: list = None):
+        self._keys = sorted(set(keys)) if keys else []
+
+    def is_empty(self):
+        return not self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __eq__(self, other: Type['SortedKeyIndex']):
+        return self._keys == other._keys
+
+    def in_order_traversal(self):
+        return list(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def insert(self, val):
+        i = bisect_left(self._keys, val)
+        if i == len(self._keys) or self._keys[i] != val:
+            self._keys.insert(i, val)
+
+    def delete(self, item):
+        i = bisect_left(self._keys, item)
+        if i < len(self._keys) and self._keys[i] == item:
+            del self._keys[i]
+
+    def get_closest_below(self, item):
+        i = bisect_left(self._keys, item)
+        return self._keys[i-1] if i > 0 else None
+
+    def get_closest_above(self, item):
+        i = bisect_right(self._keys, item)
+        return self._keys[i] if i < len(self._keys) else None
 
 
 class BinarySortedDict:
+    """
+    A dict kept in key order, read by linear interpolation between its keys.
+
+    Reads never change the dict. Keys set with set_derived() (e.g. coupon dates a
+    bootstrap interpolated) are tracked in derived, apart from the calibrated knots.
+
+    === Attributes ===
+    - d: the stored keys and values
+    - index: the stored keys in sorted order
+    - derived: the keys whose values were derived from other keys
+    """
     d: dict
-    root: Optional[BinarySearchTree]
+    index: SortedKeyIndex
+    derived: set
     def __init__(self):
         self.d = {}
-        self.root = BinarySearchTree()
+        self.index = SortedKeyIndex()
+        self.derived = set()
+        self._sorted = None
+        self._arrays = None
+
+    @classmethod
+    def from_sorted(cls, keys: list, values: list, derived: list = None) -> 'BinarySortedDict':
+        """
+        Builds a dict from keys in ascending order and their values in one pass.
+        derived optionally flags, for each key, whether it is a derived point.
+        """
+        bsd = cls()
+        bsd.d = dict(zip(keys, values))
+        bsd.index = SortedKeyIndex(keys)
+        if derived is not None:
+            bsd.derived = {k for k, flag in zip(keys, derived) if flag}
+        return bsd
 
     def __eq__(self, bsd: Type['BinarySortedDict']):
         return self.d == bsd.d
@@ -128,26 +264,57 @@ class BinarySortedDict:
     def __getitem__(self, key):
         if key in self.d:
             return self.d[key]
-        else:
+        if INTERPOLATE_MISSING:
             return self.linearly_interpolate(key)
+        raise KeyError(key)
 
     def __setitem__(self, key, item):
         if key not in self.d:
-            self.root.insert(key)
+            self.index.insert(key)
         self.d[key] = item
+        self.derived.discard(key)
+        self._sorted = None
+        self._arrays = None
+
+    def __delitem__(self, key):
+        del self.d[key]
+        self.index.delete(key)
+        self.derived.discard(key)
+        self._sorted = None
+        self._arrays = None
+
+    def set_derived(self, key, item):
+        """
+        Sets key to item, marking it as a derived point rather than a calibrated knot.
+        """
+        self[key] = item
+        self.derived.add(key)
+
+    def knots(self):
+        """
+        Returns the sorted keys and values of the calibrated knots only.
+        """
+        x, y = self.sorted_key_vals()
+        keep = [i for i, k in enumerate(x) if k not in self.derived]
+        return [x[i] for i in keep], [y[i] for i in keep]
 
     def return_sorted_list(self):
-        return list(self.root)
+        return self.index.in_order_traversal()
 
     def sorted_key_vals(self):
-        x = self.return_sorted_list()
-        y = []
-        for a in x:
-            y.append(self[a])
-        return x, y
+        """
+        Returns the sorted keys and their values as two lists.
+
+        The lists are cached until this dict next changes, and are returned
+        without copying: callers must not mutate them.
+        """
+        if self._sorted is None:
+            x = self.index.in_order_traversal()
+            self._sorted = (x, [self.d[a] for a in x])
+        return self._sorted
 
     def get_closest_keys(self, item):
-        return [self.root.get_closest_below(item), self.root.get_closest_above(item)]
+        return [self.index.get_closest_below(item), self.index.get_closest_above(item)]
 
     def linearly_interpolate(self, key) -> float:
         if self.d == {}: return None
@@ -162,3 +329,141 @@ class BinarySortedDict:
         y0 = self.d[x0]
         y1 = self.d[x1]
         return y0 + (y1 - y0) * (key - x0) / (x1 - x0)
+
+    def _sorted_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._arrays is None:
+            x, y = self.sorted_key_vals()
+            self._arrays = (np.array(x, dtype=float), np.array(y, dtype=float))
+        return self._arrays
+
+    def linearly_interpolate_many(self, keys) -> np.ndarray:
+        """
+        Vectorized linearly_interpolate over an array of keys.
+        Returns NaN everywhere if this dict is empty.
+        """
+        xs, ys = self._sorted_arrays()
+        return interpolate_sorted(xs, ys, keys)
+
+    def get_many(self, keys) -> np.ndarray:
+        """
+        Vectorized __getitem__: exact values where a key is present, and missing
+        keys interpolated or raising KeyError, as set by INTERPOLATE_MISSING.
+        """
+        xs, ys = self._sorted_arrays()
+        if INTERPOLATE_MISSING:
+            return interpolate_sorted(xs, ys, keys)
+        return _lookup_sorted(xs, ys, keys)
+
+    def compile(self) -> 'CompiledCurve':
+        """
+        Returns a frozen, array-backed snapshot of this dict for fast repeated queries.
+        This is the read-only mode to share between threads.
+        """
+        x, y = self.sorted_key_vals()
+        return CompiledCurve(x, y, [k in self.derived for k in x])
+
+
+class CompiledCurve:
+    """
+    A frozen, array-backed snapshot of a BinarySortedDict.
+
+    Keys and values are stored in sorted order, so every lookup is a bisection,
+    with no tree walk and no recursion. Build one with BinarySortedDict.compile().
+
+    Scalar queries use a point dict and key/value tuples for speed; vectorized
+    queries use searchsorted over the NumPy arrays.
+
+    Queries only read the stored sequences and never cache or add points, so one
+    curve can be shared by many threads without locks, and its memory stays the
+    same however many keys are queried.
+
+    === Attributes ===
+    - keys: the sorted keys as a read-only NumPy array
+    - values: the values matching keys as a read-only NumPy array
+    - derived: a read-only boolean array flagging the derived keys
+    """
+    __slots__ = ("keys", "values", "derived", "_key_seq", "_value_seq", "_points")
+    keys: np.ndarray
+    values: np.ndarray
+    derived: np.ndarray
+
+    def __init__(self, keys: list, values: list, derived: list = None) -> None:
+        key_arr = np.array(keys) if len(keys) else np.zeros(0)
+        value_arr = np.array(values, dtype=float)
+        derived_arr = np.zeros(len(key_arr), dtype=bool) if derived is None else np.array(derived, dtype=bool)
+        key_arr.flags.writeable = False
+        value_arr.flags.writeable = False
+        derived_arr.flags.writeable = False
+        object.__setattr__(self, "keys", key_arr)
+        object.__setattr__(self, "values", value_arr)
+        object.__setattr__(self, "derived", derived_arr)
+        object.__setattr__(self, "_key_seq", tuple(keys))
+        object.__setattr__(self, "_value_seq", tuple(float(v) for v in values))
+        object.__setattr__(self, "_points", dict(zip(self._key_seq, self._value_seq)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledCurve is immutable")
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BinarySortedDict):
+            other = other.compile()
+        if not isinstance(other, CompiledCurve):
+            return NotImplemented
+        return self._key_seq == other._key_seq and self._value_seq == other._value_seq
+
+    def __str__(self):
+        return str(self._points)
+
+    def __len__(self):
+        return len(self._key_seq)
+
+    def __iter__(self):
+        return iter(self._key_seq)
+
+    def __contains__(self, key):
+        return key in self._points
+
+    def __getitem__(self, key):
+        try:
+            return self._points[key]
+        except KeyError:
+            pass
+        if INTERPOLATE_MISSING:
+            return self.linearly_interpolate(key)
+        raise KeyError(key)
+
+    def sorted_key_vals(self):
+        return list(self._key_seq), list(self._value_seq)
+
+    def knots(self):
+        keep = ~self.derived
+        return self.keys[keep].tolist(), self.values[keep].tolist()
+
+    def get_closest_keys(self, item):
+        keys = self._key_seq
+        i = bisect_left(keys, item)
+        j = i + 1 if i < len(keys) and keys[i] == item else i
+        return [keys[i-1] if i > 0 else None, keys[j] if j < len(keys) else None]
+
+    def linearly_interpolate(self, key) -> float:
+        keys, values = self._key_seq, self._value_seq
+        n = len(keys)
+        if n == 0: return None
+        i = bisect_left(keys, key)
+        if i < n and keys[i] == key:
+            return values[i]
+        if i == 0:
+            return values[0]
+        if i == n:
+            return values[-1]
+        x0, x1 = keys[i-1], keys[i]
+        y0 = values[i-1]
+        return y0 + (values[i] - y0) * (key - x0) / (x1 - x0)
+
+    def linearly_interpolate_many(self, keys) -> np.ndarray:
+        return interpolate_sorted(self.keys, self.values, keys)
+
+    def get_many(self, keys) -> np.ndarray:
+        if INTERPOLATE_MISSING:
+            return self.linearly_interpolate_many(keys)
+        return _lookup_sorted(self.keys, self.values, keys)
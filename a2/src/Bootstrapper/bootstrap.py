@@ -1,27 +1,390 @@
 import numpy as np
-from src.BinarySortedDict.BinarySortedDict import BinarySortedDict
-from src.FinancialInstruments.Bond import DatedBond
+from bisect import bisect_right
+import pandas as pd
+from concurrent.futures import Executor
+from src.BinarySortedDict.BinarySortedDict import BinarySortedDict, interpolate_sorted
+from src.FinancialInstruments.Bond import DatedBond, BondTable
+from src.Parallel.parallel import AttachedArrays, map_shared
 
 
-def bootstrap(bonds: list[DatedBond]):
+def _table_row(bonds: BondTable, i: int) -> tuple:
+    coupon_payment = bonds.fv[i] * bonds.coupon[i]
+    coupon_periods = bonds.coupon_periods[bonds.offsets[i]:bonds.offsets[i+1]].tolist()
+    return bonds.price[i], coupon_periods, coupon_payment, bonds.fv[i] + coupon_payment, int(bonds.maturity_period[i])
+
+
+def _bond_row(bond: DatedBond) -> tuple:
+    return bond.price, bond.coupon_periods, bond.coupon_payment, bond.notional, bond.maturity_period
+
+
+def _bootstrap_rows(bonds: list[DatedBond] | BondTable):
+    """
+    Yields (price, coupon periods, coupon payment, notional, maturity period) for
+    each bond, reading a BondTable's columns directly instead of making DatedBonds.
+    """
+    if isinstance(bonds, BondTable):
+        for i in range(len(bonds)):
+            yield _table_row(bonds, i)
+    else:
+        for bond in bonds:
+            yield _bond_row(bond)
+
+
+def bootstrap(bonds: list[DatedBond] | BondTable):
     r = BinarySortedDict()
-    for bond in bonds:
-        dirty_price = bond.price
-        coupon_periods = bond.coupon_periods
-        maturity_period = bond.maturity_period
-
-        discounted_cf = 0
-        for period in coupon_periods:
-            if period not in r:  # interpolate
-                r[period] = r.linearly_interpolate(period)
-            discounted_cf += bond.coupon_payment * continuous_time_period(r[period], period/365)
-        r[maturity_period] = continuous_yield(dirty_price - discounted_cf, bond.notional, maturity_period/365)
+    for row in _bootstrap_rows(bonds):
+        _bootstrap_step(r, *row)
     return r
 
 
+def _bootstrap_step(r: BinarySortedDict, dirty_price: float, coupon_periods: list[int], coupon_payment: float,
+                    notional: float, maturity_period: int, undo: list | None = None) -> None:
+    """
+    Adds one bond to the curve r, marking interpolated coupon dates as derived.
+    If undo is given, appends (key, previous value, was derived) for every key
+    written, with None for keys that were not in r.
+    """
+    missing = [period for period in coupon_periods if period not in r]
+    if missing and len(r) == 0:
+        raise ValueError(f"coupon date {missing[0]} comes before the first known curve point")
+    if missing:  # interpolate
+        for period, rate in zip(missing, r.linearly_interpolate_many(missing)):
+            r.set_derived(period, float(rate))
+        if undo is not None:
+            undo.extend((period, None, False) for period in missing)
+    coupon_times = np.asarray(coupon_periods, dtype=float) / 365
+    discount_factors = continuous_time_period(r.get_many(coupon_periods), coupon_times)
+    discounted_cf = coupon_payment * discount_factors.sum()
+    if undo is not None:
+        undo.append((maturity_period, r.d.get(maturity_period), maturity_period in r.derived))
+    r[maturity_period] = continuous_yield(dirty_price - discounted_cf, notional, maturity_period/365)
+
+
+def _day(date) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(date), "D")
+
+
+class IncrementalBootstrap:
+    """
+    The curve of bootstrap(), kept up to date as single bonds are repriced or added.
+
+    Each bond's step only reads knots written by the steps before it, so changing
+    the bond at position i leaves the curve built by bonds[:i] as it is. Every step
+    logs the keys it wrote and what they held before; update_bond() undoes the
+    steps from i on and reruns only those.
+
+    Bonds are bootstrapped in (day, maturity) order, so they are sorted by that key
+    up front (keeping the given order among equal keys); update_bond() relies on
+    this order to place bonds by bisection.
+
+    Bonds given as a BondTable stay in the table: only bonds passed to update_bond()
+    are held as DatedBonds. Each bond's (day, maturity) sort key and an
+    (ISIN, day) -> position index are kept, so finding a bond costs no scan.
+
+    === Attributes ===
+    - rates: the bootstrapped curve, equal to bootstrap(self.bonds)
+    """
+    rates: BinarySortedDict
+
+    def __init__(self, bonds: list[DatedBond] | BondTable) -> None:
+        if isinstance(bonds, BondTable):
+            self._table = bonds
+            self._entries = list(range(len(bonds)))
+            days = bonds.date.astype("datetime64[D]").astype(np.int64).tolist()
+            self._keys = list(zip(days, bonds.maturity_period.tolist()))
+            isins = bonds.isin.tolist()
+        else:
+            self._table = None
+            self._entries = list(bonds)
+            days = [int(_day(bond.date).astype(np.int64)) for bond in bonds]
+            self._keys = [(day, bond.maturity_period) for day, bond in zip(days, bonds)]
+            isins = [bond.isin for bond in bonds]
+        order = sorted(range(len(self._keys)), key=self._keys.__getitem__)
+        self._entries = [self._entries[j] for j in order]
+        self._keys = [self._keys[j] for j in order]
+        days = [days[j] for j in order]
+        isins = [isins[j] for j in order]
+        self._index = {(isin, day): j for j, (isin, day) in enumerate(zip(isins, days))}
+        self.rates = BinarySortedDict()
+        self._undo = []
+        self._rerun_from(0)
+
+    @property
+    def bonds(self) -> list[DatedBond]:
+        """
+        The bonds in bootstrap order, as DatedBonds. Rows of a BondTable are made on demand.
+        """
+        return [self._table[e] if isinstance(e, int) else e for e in self._entries]
+
+    def table(self) -> BondTable:
+        """
+        The bonds in bootstrap order, as a BondTable.
+        """
+        added = [e for e in self._entries if not isinstance(e, int)]
+        if self._table is None:
+            return BondTable.from_bonds(added)
+        if not added:
+            return self._table.take(np.array(self._entries, dtype=int))
+        combined = BondTable.concat([self._table, BondTable.from_bonds(added)])
+        order, n = [], len(self._table)
+        for e in self._entries:
+            if isinstance(e, int):
+                order.append(e)
+            else:
+                order.append(n)
+                n += 1
+        return combined.take(np.array(order))
+
+    def _rows(self, i: int):
+        for e in self._entries[i:]:
+            yield _table_row(self._table, e) if isinstance(e, int) else _bond_row(e)
+
+    def _rerun_from(self, i: int) -> None:
+        while len(self._undo) > i:
+            for key, value, derived in reversed(self._undo.pop()):
+                if value is None:
+                    del self.rates[key]
+                elif derived:
+                    self.rates.set_derived(key, value)
+                else:
+                    self.rates[key] = value
+        for row in self._rows(i):
+            undo = []
+            _bootstrap_step(self.rates, *row, undo=undo)
+            self._undo.append(undo)
+
+    def _isin(self, j: int) -> str:
+        e = self._entries[j]
+        return str(self._table.isin[e]) if isinstance(e, int) else e.isin
+
+    def update_bond(self, bond: DatedBond) -> BinarySortedDict:
+        """
+        Replaces the bond with the same ISIN and date as bond, or adds bond after the
+        bonds of its date maturing no later than it. Returns the updated curve.
+        """
+        day = int(_day(bond.date).astype(np.int64))
+        key = (day, bond.maturity_period)
+        old = self._index.get((bond.isin, day))
+        if old is not None and self._keys[old] == key:
+            self._entries[old] = bond
+            self._rerun_from(old)
+            return self.rates
+        if old is not None:
+            self._entries.pop(old)
+            self._keys.pop(old)
+        new = bisect_right(self._keys, key)
+        self._entries.insert(new, bond)
+        self._keys.insert(new, key)
+        start = new if old is None else min(old, new)
+        for j in range(start, len(self._entries)):
+            self._index[(self._isin(j), self._keys[j][0])] = j
+        self._rerun_from(start)
+        return self.rates
+
+
 def continuous_time_period(r,t):
     return np.exp(-r*t)
 
 
 def continuous_yield(num,den,t):
-    return -np.log(num/den) / t
\ No newline at end of file
+    return -np.log(num/den) / t
+
+
+def annual_time_period(r, t):
+    return 1 / (1+r)**t
+
+
+def annual_yield(num, den, t):
+    return (num/den)**(1/t) - 1
+
+
+def _cashflow_days(bonds: list[DatedBond] | BondTable) -> tuple[np.ndarray, ...]:
+    """
+    Returns (days, counts, coupon_payments, notionals, maturities, prices) for bonds:
+    days[i, :counts[i]] are bond i's coupon periods, in a zero-padded matrix.
+    """
+    if not isinstance(bonds, BondTable):
+        bonds = BondTable.from_bonds(bonds)
+    counts = np.diff(bonds.offsets)
+    days = np.zeros((len(bonds), int(counts.max(initial=0))), dtype=np.int64)
+    rows = np.repeat(np.arange(len(bonds)), counts)
+    cols = np.arange(len(bonds.coupon_periods)) - np.repeat(bonds.offsets[:-1], counts)
+    days[rows, cols] = bonds.coupon_periods
+    coupon_payments = bonds.fv * bonds.coupon
+    return days, counts, coupon_payments, bonds.fv + coupon_payments, bonds.maturity_period, bonds.price
+
+
+def bootstrap_matrix(bonds: list[DatedBond] | BondTable, compounding_period: int = 0) -> BinarySortedDict:
+    """
+    Bootstraps the same curve as bootstrap(), by forward substitution on the bonds'
+    cashflow matrix instead of one dict update per coupon.
+
+    Taking bonds in order, row i of the cashflow matrix only involves discount
+    factors at bond i's coupon dates and at its maturity. The interpolation rule
+    makes the coupon ones known from earlier rows: a coupon date's rate is linearly
+    interpolated between the knots so far (flat past either end), and the date then
+    becomes a knot itself. So the system is lower triangular and each step solves
+    one discount factor with a vector dot product:
+        DF(maturity) = (price - coupon * sum(DF(coupon dates))) / notional
+    The triangular structure only depends on the dates, so it is laid out once
+    before any value is solved.
+
+    Rates are only used for interpolation. They are mapped to and from discount
+    factors by the compounding convention, so both conventions share the solver.
+
+    === Parameters ===
+    - bonds: the bonds to bootstrap, in the order bootstrap() would use
+    - compounding_period: 0 for continuous compounding, 1 for annual compounding
+    """
+    xs, ys, derived = _forward_substitute(*_cashflow_days(bonds), compounding_period)
+    return BinarySortedDict.from_sorted(xs.tolist(), ys.tolist(), derived.tolist())
+
+
+def _substitution_plan(coupon_periods: list, maturities: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Lays out the lower-triangular system solved by _forward_substitute().
+
+    Every curve write is a variable, numbered in the order bootstrap() makes it:
+    bond i first writes its coupon dates not yet on the curve (derived variables,
+    interpolated from the variables holding their neighbouring keys), then its
+    maturity. So a variable only depends on variables numbered below it. Only keys
+    are needed to find these dependencies, so they are found once, by bisecting a
+    sorted list of keys, and no values are touched.
+
+    Returns (coupon_vars, lo, hi, frac, maturity_vars, keys, key_vars):
+    - coupon_vars: the variable read at each coupon date, bond by bond
+    - lo, hi, frac: for each variable, the neighbours and weight it is interpolated
+        with (lo == hi and frac == 0 past either end; unused for maturities)
+    - maturity_vars: the variable written at each bond's maturity
+    - keys, key_vars: the sorted curve keys and the variable each ends up holding
+    """
+    n_coupons = sum(len(periods) for periods in coupon_periods)
+    lo = np.zeros(n_coupons + len(maturities), dtype=np.int64)
+    hi = np.zeros(n_coupons + len(maturities), dtype=np.int64)
+    frac = np.zeros(n_coupons + len(maturities))
+    coupon_vars = np.zeros(n_coupons, dtype=np.int64)
+    maturity_vars = np.zeros(len(maturities), dtype=np.int64)
+    keys, key_vars, current = [], [], {}
+    v = c = 0
+    for i, (periods, m) in enumerate(zip(coupon_periods, np.asarray(maturities).tolist())):
+        missing = []
+        for day in np.asarray(periods).tolist():
+            var = current.get(day)
+            if var is None:
+                if not keys:
+                    raise ValueError(f"coupon date {day} of bond {i} comes before the first known curve point")
+                j = bisect_right(keys, day)
+                below, above = keys[max(j - 1, 0)], keys[min(j, len(keys) - 1)]
+                lo[v], hi[v] = key_vars[max(j - 1, 0)], key_vars[min(j, len(keys) - 1)]
+                if below < day < above:
+                    frac[v] = (day - below) / (above - below)
+                missing.append((day, v))
+                var = v
+                v += 1
+            coupon_vars[c] = var
+            c += 1
+        for day, var in missing:
+            if day in current:
+                continue
+            j = bisect_right(keys, day)
+            keys.insert(j, day)
+            key_vars.insert(j, var)
+            current[day] = var
+        if m not in current:
+            j = bisect_right(keys, m)
+            keys.insert(j, m)
+            key_vars.insert(j, v)
+        else:
+            key_vars[bisect_right(keys, m) - 1] = v
+        current[m] = v
+        maturity_vars[i] = v
+        v += 1
+    return (coupon_vars, lo[:v], hi[:v], frac[:v], maturity_vars,
+            np.array(keys, dtype=np.int64), np.array(key_vars, dtype=np.int64))
+
+
+def _forward_substitute(days: np.ndarray, counts: np.ndarray, coupon_payments: np.ndarray,
+                        notionals: np.ndarray, maturities: np.ndarray, prices: np.ndarray,
+                        compounding_period: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the points (xs, ys) of bootstrap_matrix() for the columns given by
+    _cashflow_days(), and a mask of the derived (interpolated coupon) points.
+
+    The system laid out by _substitution_plan() is solved by forward substitution
+    over fixed arrays: each bond fills its derived rates with one gather, then its
+    maturity rate from one dot product. Nothing is inserted or re-sorted.
+    """
+    if compounding_period == 0:
+        to_discount, to_rate = continuous_time_period, lambda d, t: continuous_yield(d, 1.0, t)
+    elif compounding_period == 1:
+        to_discount, to_rate = annual_time_period, lambda d, t: annual_yield(1.0, d, t)
+    else:
+        raise ValueError("compounding_period must be 0 (continuous) or 1 (annual)")
+    periods = [row[:count] for row, count in zip(days, counts)]
+    coupon_vars, lo, hi, frac, maturity_vars, keys, key_vars = _substitution_plan(periods, maturities)
+    coupon_offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=coupon_offsets[1:])
+    coupon_times = days[np.arange(days.shape[1]) < counts[:, None]] / 365
+    rates = np.zeros(len(lo))
+    start = 0
+    for i, end in enumerate(maturity_vars.tolist()):
+        if end > start:
+            y0 = rates[lo[start:end]]
+            rates[start:end] = y0 + (rates[hi[start:end]] - y0) * frac[start:end]
+        a, b = coupon_offsets[i], coupon_offsets[i+1]
+        discounted_cf = coupon_payments[i] * to_discount(rates[coupon_vars[a:b]], coupon_times[a:b]).sum()
+        rates[end] = to_rate((prices[i] - discounted_cf) / notionals[i], maturities[i]/365)
+        start = end + 1
+    derived = np.ones(len(lo), dtype=bool)
+    derived[maturity_vars] = False
+    return keys, rates[key_vars], derived[key_vars]
+
+
+def _bootstrap_dates(spec: dict, chunk: np.ndarray, compounding_period: int) -> list[tuple[np.ndarray, ...]]:
+    """
+    Worker for bootstrap_dates(): the points of each date in chunk, read from shared memory.
+    """
+    columns = ("days", "counts", "coupon_payments", "notionals", "maturities", "prices")
+    curves = []
+    with AttachedArrays(spec) as a:
+        for d in chunk:
+            lo, hi = a["date_offsets"][d], a["date_offsets"][d+1]
+            curves.append(_forward_substitute(*(a[key][lo:hi] for key in columns), compounding_period))
+    return curves
+
+
+def bootstrap_dates(bonds: list[DatedBond] | BondTable, dates: list, compounding_period: int = 0,
+                    jobs: int = 1, executor: Executor | None = None) -> list[BinarySortedDict]:
+    """
+    Bootstraps a separate curve from the bonds priced on each of dates, and returns
+    the curves in the order of dates.
+
+    With jobs == 1 and no executor each curve comes from bootstrap() (or
+    bootstrap_matrix() for annual compounding). Otherwise the
+    dates are split across worker processes, which run bootstrap_matrix() on the
+    cashflow columns of all dates, shared through shared memory rather than pickled.
+
+    === Parameters ===
+    - bonds: the bonds of every date, in bootstrap order within each date
+    - dates: the dates to build curves for
+    - compounding_period: 0 for continuous compounding, 1 for annual compounding
+    - jobs: the number of worker processes to start
+    - executor: an existing executor to run the dates on instead
+    """
+    if not isinstance(bonds, BondTable):
+        bonds = BondTable.from_bonds(bonds)
+    dates = [np.datetime64(pd.Timestamp(date), "D") for date in dates]
+    if jobs == 1 and executor is None:
+        if compounding_period == 0:
+            return [bootstrap(bonds.take(bonds.date == date)) for date in dates]
+        return [bootstrap_matrix(bonds.take(bonds.date == date), compounding_period) for date in dates]
+    rows = [np.flatnonzero(bonds.date == date) for date in dates]
+    date_offsets = np.zeros(len(dates) + 1, dtype=np.int64)
+    np.cumsum([len(r) for r in rows], out=date_offsets[1:])
+    table = bonds.take(np.concatenate(rows) if rows else np.zeros(0, dtype=int))
+    columns = ("days", "counts", "coupon_payments", "notionals", "maturities", "prices")
+    arrays = dict(zip(columns, _cashflow_days(table)))
+    arrays["date_offsets"] = date_offsets
+    curves = map_shared(_bootstrap_dates, arrays, len(dates), (compounding_period,), jobs=jobs, executor=executor)
+    return [BinarySortedDict.from_sorted(xs.tolist(), ys.tolist(), derived.tolist())
+            for xs, ys, derived in curves]
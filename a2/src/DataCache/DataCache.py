@@ -0,0 +1,93 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Bump whenever the processing of the cached frames changes, so stale caches are rebuilt.
+PROCESSING_VERSION = 1
+
+
+def file_digest(filenames: list[str], version: int = PROCESSING_VERSION) -> str:
+    """
+    Returns a hash of the contents of filenames, in order, and the processing version.
+    """
+    h = hashlib.sha256(f"v{version}".encode())
+    for filename in filenames:
+        h.update(b"\0")
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()[:16]
+
+
+def save_frame(df: pd.DataFrame, filename: str) -> None:
+    """
+    Saves df to filename as a columnar .npz archive. The index must be numeric.
+
+    Columns holding lists (e.g. Coupon Periods) are stored as one flat array plus
+    offsets, so no column needs pickling.
+    """
+    arrays = {"__columns__": np.array(df.columns, dtype=str),
+              "__index__": df.index.to_numpy()}
+    ragged = []
+    for i, column in enumerate(df.columns):
+        values = df[column]
+        if values.dtype == object and len(values) and isinstance(values.iloc[0], (list, tuple, np.ndarray)):
+            lengths = np.array([len(v) for v in values], dtype=np.int64)
+            offsets = np.zeros(len(values) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            parts = [np.asarray(v) for v in values if len(v)]
+            arrays[f"col{i}"] = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+            arrays[f"off{i}"] = offsets
+            ragged.append(column)
+        elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+            arrays[f"col{i}"] = values.to_numpy()
+        else:
+            arrays[f"col{i}"] = values.to_numpy().astype(str)
+    arrays["__ragged__"] = np.array(ragged, dtype=str)
+    tmp = filename + ".tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, filename)
+
+
+def load_frame(filename: str) -> pd.DataFrame:
+    """
+    Loads a DataFrame written by save_frame.
+    """
+    with np.load(filename, allow_pickle=False) as data:
+        ragged = set(data["__ragged__"].tolist())
+        columns = {}
+        for i, column in enumerate(data["__columns__"].tolist()):
+            values = data[f"col{i}"]
+            if column in ragged:
+                offsets = data[f"off{i}"]
+                values = [v.tolist() for v in np.split(values, offsets[1:-1])] if len(offsets) > 1 else []
+            columns[column] = values
+        index = data["__index__"]
+    return pd.DataFrame(columns, index=index)
+
+
+def cached_frame(cache_dir: str, sources: list[str], build: callable) -> pd.DataFrame:
+    """
+    Returns build(), reusing the copy cached in cache_dir while sources are unchanged.
+
+    The cache file is named after the sources and keyed by file_digest(sources), so
+    only the frames whose input files changed are rebuilt. Older caches of the same
+    sources are removed when a new one is written.
+
+    === Parameters ===
+    - cache_dir: the folder holding the cache files; created if missing
+    - sources: the input files build() reads
+    - build: a function with no arguments that builds the DataFrame
+    """
+    stem = "+".join(os.path.splitext(os.path.basename(s))[0] for s in sources)
+    filename = os.path.join(cache_dir, f"{stem}-{file_digest(sources)}.npz")
+    if os.path.exists(filename):
+        return load_frame(filename)
+    df = build()
+    os.makedirs(cache_dir, exist_ok=True)
+    for old in os.listdir(cache_dir):
+        if old.startswith(stem + "-") and old.endswith(".npz"):
+            os.remove(os.path.join(cache_dir, old))
+    save_frame(df, filename)
+    return df
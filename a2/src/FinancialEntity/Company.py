@@ -1,7 +1,10 @@
-from src.FinancialInstruments.Bond import Bond, DatedBond, sort_bond_list
+import numpy as np
+import pandas as pd
+from src.FinancialInstruments.Bond import Bond, DatedBond, BondTable, sort_bond_list
 from src.FinancialInstruments.Stock import DatedStock
-from src.BinarySortedDict.BinarySortedDict import BinarySortedDict
-from src.Bootstrapper.bootstrap import bootstrap
+from src.BinarySortedDict.BinarySortedDict import BinarySortedDict, CompiledCurve
+from concurrent.futures import Executor
+from src.Bootstrapper.bootstrap import bootstrap, bootstrap_dates, IncrementalBootstrap
 
 
 class Company:
@@ -10,20 +13,44 @@ class Company:
 
     === Attributes ===
     - name: the name of this company
-    - bonds: a sorted list of bonds this company has
+    - bonds: a sorted list of bonds this company has, or a BondTable sorted by date
     - rates: the interest rates for this company
     - recovery_rate: this companies recovery rate, defaults to 50%
     """
     name: str
-    bonds: list[DatedBond]
+    bonds: list[DatedBond] | BondTable
     rates: BinarySortedDict | None
     recovery_rate: float | None
 
-    def __init__(self, name: str, bonds: list[DatedBond], recovery_rate: float=0.5) -> None:
+    def __init__(self, name: str, bonds: list[DatedBond] | BondTable, recovery_rate: float=0.5) -> None:
         self.name = name
-        self.bonds = sort_bond_list(bonds)
+        self._bootstrap = None
+        if isinstance(bonds, BondTable):
+            self.bonds = bonds.sorted_by_date()
+        else:
+            self.bonds = sort_bond_list(bonds)
         self.rates = None
         self.recovery_rate = recovery_rate
+        self._curve = None
+
+    @property
+    def bonds(self) -> list[DatedBond] | BondTable:
+        """
+        This company's bonds. After update_bond(), they are read back from the
+        incremental bootstrap the first time they are needed.
+        """
+        if self._bonds is None:
+            if self._as_table:
+                self._bonds = self._bootstrap.table()
+            else:
+                self._bonds = self._bootstrap.bonds
+        return self._bonds
+
+    @bonds.setter
+    def bonds(self, bonds: list[DatedBond] | BondTable) -> None:
+        self._bonds = bonds
+        self._as_table = isinstance(bonds, BondTable)
+        self._bootstrap = None
 
     def get_recovery_rate(self) -> float:
         return self.recovery_rate
@@ -46,6 +73,47 @@ class Company:
         Computes the rates for this company by bootstrapping its bonds.
         """
         self.rates = bootstrap(self.bonds)
+        self._bootstrap = None
+        self._curve = None
+
+    def update_bond(self, bond: DatedBond) -> None:
+        """
+        Reprices bond (matched by ISIN and date) or adds it, recomputing only the
+        part of the rates bootstrapped after it.
+        """
+        if self._bootstrap is None:
+            self._bootstrap = IncrementalBootstrap(self.bonds)
+        self.rates = self._bootstrap.update_bond(bond)
+        self._curve = None
+        self._bonds = None
+
+    def compute_rates_by_date(self, dates: list | None = None, jobs: int = 1,
+                              executor: Executor | None = None) -> dict[pd.Timestamp, BinarySortedDict]:
+        """
+        Returns one curve per date, bootstrapped from this company's bonds priced on
+        that date, keyed and ordered by date.
+
+        === Parameters ===
+        - dates: the dates to build curves for, defaults to every date with a price
+        - jobs: the number of worker processes to spread the dates over
+        - executor: an existing executor to run the dates on instead
+        """
+        bonds = self.bonds if isinstance(self.bonds, BondTable) else BondTable.from_bonds(self.bonds)
+        if dates is None:
+            dates = np.unique(bonds.date)
+        curves = bootstrap_dates(bonds, dates, jobs=jobs, executor=executor)
+        return {pd.Timestamp(date): curve for date, curve in zip(dates, curves)}
+
+    def get_curve(self) -> CompiledCurve:
+        """
+        Returns a read-only snapshot of this company's rates, which many threads
+        can query at once without locks. A new snapshot is taken after the rates change.
+        """
+        if self.rates is None:
+            self.compute_rates()
+        if self._curve is None:
+            self._curve = self.rates.compile()
+        return self._curve
 
     def get_rates(self, periods: list[int]) -> list[float]:
         """
@@ -55,12 +123,10 @@ class Company:
         """
         if self.rates is None:
             self.compute_rates()
-        rates = []
-        for period in periods:
-            if period < 0:
-                raise ValueError("Please provide a non-negative integer!")
-            rates.append(self.rates[period])
-        return rates
+        periods = np.asarray(periods)
+        if np.any(periods < 0):
+            raise ValueError("Please provide a non-negative integer!")
+        return self.rates.get_many(periods).tolist()
 
 
 class StockCompany(Company):
@@ -78,7 +144,7 @@ class StockCompany(Company):
     equity: float
     debt: float
     
-    def __init__(self, name: str, bonds: list[Bond], stock: DatedStock,
+    def __init__(self, name: str, bonds: list[DatedBond] | BondTable, stock: DatedStock,
                  assets: float, equity: float, debt: float, recovery_rate: float=0.5) -> None:
         super().__init__(name, bonds, recovery_rate)
         self.stock = stock
@@ -1,7 +1,10 @@
 import pandas as pd
 import numpy as np
+import scipy.optimize
 from operator import attrgetter
+from collections import OrderedDict
 from src.BinarySortedDict.BinarySortedDict import BinarySortedDict
+from src.DataCache.DataCache import cached_frame
 
 ###########################
 ### Bond Data Structure ###
@@ -11,9 +14,11 @@ class Bond:
     Class representing a bond's static information.
     The data contained in this class should not change over time.
     """
+    __slots__ = ("isin", "fv", "coupon", "coupon_payment", "notional")
     isin: str
     fv: float
     coupon: float
+    coupon_payment: float
     notional: float
 
     def __init__(self, isin: str, fv: float, coupon: float):
@@ -28,10 +33,18 @@ class DatedBond(Bond):
     """
     A class representing a bond at a current date.
     The data contained in this class is only valid for a specific date.
+
+    The cashflow schedule is built once on construction and is the only copy
+    kept: times holds every cashflow time in years and amounts the matching
+    payment, with the notional folded into the final entry at maturity. Both
+    are read-only. coupon_periods and maturity_period are read back from times,
+    so they can never disagree with it.
     """
+    __slots__ = ("date", "price", "times", "amounts")
     date: np.datetime64
-    maturity_period: int
-    coupon_periods: list[int]
+    price: float
+    times: np.ndarray
+    amounts: np.ndarray
 
     def __init__(self, isin: str, fv: float, coupon: float, 
                  date: np.datetime64, price: float,
@@ -39,12 +52,181 @@ class DatedBond(Bond):
         super().__init__(isin, fv, coupon)
         self.date = date
         self.price = price
-        self.maturity_period = maturity_period
-        self.coupon_periods = coupon_periods
+        n = len(coupon_periods)
+        self.times = np.empty(n + 1)
+        self.times[:n] = coupon_periods
+        self.times[n] = maturity_period
+        self.times /= 365
+        self.amounts = np.full(n + 1, self.coupon_payment, dtype=float)
+        self.amounts[n] = self.notional
+        self.times.flags.writeable = False
+        self.amounts.flags.writeable = False
+
+    @property
+    def maturity_period(self) -> int:
+        """
+        The days from the price date to maturity.
+        """
+        return int(np.rint(self.times[-1] * 365))
+
+    @property
+    def coupon_periods(self) -> list[int]:
+        """
+        The days from the price date to each remaining coupon.
+        """
+        return np.rint(self.times[:-1] * 365).astype(int).tolist()
     
     def __str__(self) -> str:
         return f"{self.isin} | {self.coupon} | {self.maturity_period}"
 
+def _gather_ragged(flat: np.ndarray, offsets: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Selects rows of a ragged array stored as flat values plus offsets.
+    Returns the selected rows' flat values and their new offsets.
+    """
+    counts = offsets[1:][rows] - offsets[:-1][rows]
+    new_offsets = np.zeros(len(rows) + 1, dtype=int)
+    np.cumsum(counts, out=new_offsets[1:])
+    index = np.repeat(offsets[:-1][rows] - new_offsets[:-1], counts) + np.arange(new_offsets[-1])
+    return flat[index], new_offsets
+
+
+class BondTable:
+    """
+    A columnar table of dated bonds, one row per bond and price date.
+
+    Every attribute is a NumPy array aligned by row, so selecting bonds and
+    running vector math never creates per-bond objects. DatedBond views are
+    made on demand by indexing or iterating.
+
+    === Attributes ===
+    - isin: the ISIN of each bond
+    - fv: the face value of each bond
+    - coupon: the coupon rate paid each period, as in DatedBond
+    - date: the price date of each row
+    - price: the dirty price of each row
+    - maturity_period: the days from the price date to maturity
+    - coupon_periods: the days from the price date to each remaining coupon,
+        flattened; row i's are coupon_periods[offsets[i]:offsets[i+1]]
+    - offsets: the start of each row in coupon_periods, plus the total length
+    """
+    __slots__ = ("isin", "fv", "coupon", "date", "price", "maturity_period",
+                 "coupon_periods", "offsets")
+    isin: np.ndarray
+    fv: np.ndarray
+    coupon: np.ndarray
+    date: np.ndarray
+    price: np.ndarray
+    maturity_period: np.ndarray
+    coupon_periods: np.ndarray
+    offsets: np.ndarray
+
+    def __init__(self, isin: np.ndarray, fv: np.ndarray, coupon: np.ndarray,
+                 date: np.ndarray, price: np.ndarray, maturity_period: np.ndarray,
+                 coupon_periods: np.ndarray, offsets: np.ndarray) -> None:
+        self.isin = np.asarray(isin, dtype=str)
+        self.fv = np.asarray(fv, dtype=float)
+        self.coupon = np.asarray(coupon, dtype=float)
+        self.date = np.asarray(date).astype("datetime64[D]")
+        self.price = np.asarray(price, dtype=float)
+        self.maturity_period = np.asarray(maturity_period, dtype=np.int64)
+        self.coupon_periods = np.asarray(coupon_periods, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=int)
+
+    @classmethod
+    def from_bonds(cls, bonds: list[DatedBond]) -> 'BondTable':
+        """
+        Builds a table holding the same rows as bonds, in the same order.
+        """
+        offsets = np.zeros(len(bonds) + 1, dtype=int)
+        np.cumsum([len(bond.coupon_periods) for bond in bonds], out=offsets[1:])
+        periods = [p for bond in bonds for p in bond.coupon_periods]
+        return cls([bond.isin for bond in bonds], [bond.fv for bond in bonds],
+                   [bond.coupon for bond in bonds], [np.datetime64(pd.Timestamp(bond.date), "D") for bond in bonds],
+                   [bond.price for bond in bonds], [bond.maturity_period for bond in bonds],
+                   periods, offsets)
+
+    @classmethod
+    def concat(cls, tables: list['BondTable']) -> 'BondTable':
+        """
+        Builds a table holding the rows of every table in tables, in order.
+        """
+        ends = np.cumsum([0] + [len(t.coupon_periods) for t in tables[:-1]])
+        offsets = np.concatenate([[0]] + [t.offsets[1:] + end for t, end in zip(tables, ends)])
+        return cls(*(np.concatenate([getattr(t, name) for t in tables])
+                     for name in ("isin", "fv", "coupon", "date", "price", "maturity_period", "coupon_periods")),
+                   offsets)
+
+    def __len__(self) -> int:
+        return len(self.isin)
+
+    def __getitem__(self, i):
+        """
+        Returns a DatedBond view of row i, or a sub-table for a slice,
+        index array or boolean mask.
+        """
+        if isinstance(i, (int, np.integer)):
+            periods = self.coupon_periods[self.offsets[i]:self.offsets[i+1]]
+            return DatedBond(str(self.isin[i]), float(self.fv[i]), float(self.coupon[i]),
+                             self.date[i], float(self.price[i]),
+                             int(self.maturity_period[i]), periods.tolist())
+        return self.take(np.arange(len(self))[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def take(self, rows) -> 'BondTable':
+        """
+        Returns a new table of the given rows (indices or a boolean mask).
+        """
+        rows = np.arange(len(self))[rows]
+        periods, offsets = _gather_ragged(self.coupon_periods, self.offsets, rows)
+        return BondTable(self.isin[rows], self.fv[rows], self.coupon[rows], self.date[rows],
+                         self.price[rows], self.maturity_period[rows], periods, offsets)
+
+    def on_date(self, date) -> 'BondTable':
+        return self.take(self.date == np.datetime64(pd.Timestamp(date), "D"))
+
+    def for_isin(self, isin: str) -> 'BondTable':
+        return self.take(self.isin == isin)
+
+    def for_issuer(self, prefix: str) -> 'BondTable':
+        """
+        Returns the rows whose ISIN starts with prefix, e.g. "CA135087" for Canada.
+        """
+        return self.take(np.char.startswith(self.isin, prefix))
+
+    def maturing_between(self, low: int, high: int) -> 'BondTable':
+        """
+        Returns the rows with low <= maturity period <= high, in days.
+        """
+        return self.take((self.maturity_period >= low) & (self.maturity_period <= high))
+
+    def sorted_by_date(self) -> 'BondTable':
+        """
+        Returns the rows ordered by price date, then by maturity period.
+        """
+        return self.take(np.lexsort((self.maturity_period, self.date)))
+
+    def cashflow_matrices(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Same as cashflow_matrices for a list of bonds, built without any DatedBond.
+        """
+        counts = np.diff(self.offsets)
+        width = int(counts.max(initial=0)) + 1
+        rows = np.repeat(np.arange(len(self)), counts)
+        cols = np.arange(len(self.coupon_periods)) - np.repeat(self.offsets[:-1], counts)
+        coupon_payment = self.fv * self.coupon
+        times = np.zeros((len(self), width))
+        amounts = np.zeros((len(self), width))
+        times[rows, cols] = self.coupon_periods / 365
+        amounts[rows, cols] = coupon_payment[rows]
+        times[np.arange(len(self)), counts] = self.maturity_period / 365
+        amounts[np.arange(len(self)), counts] = self.fv + coupon_payment
+        return times, amounts, self.price.copy()
+
+
 ######################
 ### Bond Functions ###
 ######################
@@ -64,33 +246,105 @@ def ytm_price(bond: DatedBond, ytm: float) -> float:
     - bond: the bond to compute the price of
     - ytm: the ytm to use
     """
-    P = 0
-    for period in bond.coupon_periods:
-        t = period/365
-        P += bond.coupon_payment * np.exp(-ytm*t)
-    t = bond.maturity_period/365
-    return P + bond.notional * np.exp(-ytm*t) - bond.price
+    return bond.amounts @ np.exp(-ytm*bond.times) - bond.price
 
 
-def d_ytm_price(bond: Bond, ytm: float) -> float:
+def d_ytm_price(bond: DatedBond, ytm: float) -> float:
     """
     Derivative of the ytm_price function with respect to ytm.
     """
-    P = 0
-    for period in bond.coupon_periods:
-        t = period/365
-        P -= bond.coupon_payment * t * np.exp(-ytm*t)
-    t = bond.maturity_period/365
-    return P - bond.notional * t * np.exp(-ytm*t)
+    return -(bond.amounts * bond.times) @ np.exp(-ytm*bond.times)
+
+
+class YTMCache:
+    """
+    A bounded least-recently-used cache of solved yields.
 
+    Entries are keyed on the ISIN, price date and dirty price, the bond's
+    cashflow terms (face value, coupon, maturity and coupon periods) and the
+    solver settings, so a bond that is repriced, has different terms under the
+    same ISIN, or is solved with different settings, is a new entry.
 
-def newton_raphson_ytm(bond: Bond, max_iter: int = 1000) -> float:
+    === Attributes ===
+    - maxsize: the maximum number of yields kept before the oldest is evicted
+    - hits: the number of lookups answered from the cache
+    - misses: the number of lookups that had to be solved
+    """
+    maxsize: int
+    hits: int
+    misses: int
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(bond: DatedBond, settings: tuple) -> tuple:
+        return YTMCache.row_key(bond.isin, bond.date, bond.price, bond.fv, bond.coupon,
+                                bond.maturity_period, bond.coupon_periods, settings)
+
+    @staticmethod
+    def row_key(isin: str, date, price: float, fv: float, coupon: float, maturity_period: int,
+                coupon_periods, settings: tuple) -> tuple:
+        return (str(isin), pd.Timestamp(date), float(price), float(fv), float(coupon),
+                int(maturity_period), tuple(int(p) for p in coupon_periods), settings)
+
+    def get(self, key: tuple) -> float | None:
+        """
+        Returns the cached yield for key, or None, updating the hit/miss counters.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple, ytm: float) -> None:
+        self._entries[key] = ytm
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, isin: str | None = None) -> None:
+        """
+        Drops every cached yield for isin, or the whole cache if isin is None.
+        The hit/miss counters are kept.
+        """
+        if isin is None:
+            self._entries.clear()
+        else:
+            for key in [key for key in self._entries if key[0] == isin]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """
+        Drops every cached yield and resets the counters.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def newton_raphson_ytm(bond: DatedBond, max_iter: int = 1000,
+                       cache: YTMCache | None = None) -> float:
     """
     Uses the Newton-Raphson method to solve for YTM.
+    If a cache is given, solved yields are memoized in it.
     """
     old_ytm = np.inf
     new_ytm = 0.03
     TOL = 1e-6
+    if cache is not None:
+        key = YTMCache.key(bond, ("newton", new_ytm, TOL, max_iter))
+        ytm = cache.get(key)
+        if ytm is not None:
+            return ytm
     i = 0
     while i < max_iter and np.abs(new_ytm - old_ytm) > TOL:
         old_ytm = new_ytm
@@ -98,19 +352,264 @@ def newton_raphson_ytm(bond: Bond, max_iter: int = 1000) -> float:
         i += 1
     if i == max_iter:
         print("Max number of iterations reached.")
+    if cache is not None:
+        cache.put(key, new_ytm)
     return new_ytm
 
 
-def compute_spread(gov: DatedBond, com: DatedBond) -> float:
+def ytm_price_and_derivative(bond: DatedBond, ytm: float) -> tuple[float, float]:
+    """
+    Computes ytm_price and d_ytm_price together, evaluating each discount factor once.
+    """
+    discounted = bond.amounts * np.exp(-ytm*bond.times)
+    return discounted.sum() - bond.price, -(discounted @ bond.times)
+
+
+class YTMResult:
+    """
+    The outcome of solving for a bond's YTM.
+
+    === Attributes ===
+    - ytm: the solved yield to maturity
+    - iterations: the number of iterations used, across all methods tried
+    - residual: the price error, ytm_price(bond, ytm), at the solution
+    - converged: whether the solver met its tolerance
+    - method: "newton", or "brent" if Newton diverged and the bracketed
+        fallback was used
+    """
+    __slots__ = ("ytm", "iterations", "residual", "converged", "method")
+    ytm: float
+    iterations: int
+    residual: float
+    converged: bool
+    method: str
+
+    def __init__(self, ytm: float, iterations: int, residual: float,
+                 converged: bool, method: str) -> None:
+        self.ytm = ytm
+        self.iterations = iterations
+        self.residual = residual
+        self.converged = converged
+        self.method = method
+
+    def __str__(self) -> str:
+        return (f"ytm={self.ytm} | {self.method} | iterations={self.iterations} | "
+                f"residual={self.residual} | converged={self.converged}")
+
+
+def _bracket_ytm(bond: DatedBond, low: float = -1.0, high: float = 1.0,
+                 max_expansions: int = 50) -> tuple[float, float] | None:
+    """
+    Finds [low, high] with ytm_price(low) >= 0 >= ytm_price(high), or None.
+    ytm_price is decreasing in ytm, so the interval is widened until it does.
+    """
+    for _ in range(max_expansions):
+        with np.errstate(over="ignore"):
+            f_low = ytm_price(bond, low)
+            f_high = ytm_price(bond, high)
+        if f_low >= 0 >= f_high:
+            return low, high
+        if f_low < 0:
+            low = 2*low
+        if f_high > 0:
+            high = 2*high
+    return None
+
+
+def solve_ytm(bond: DatedBond, guess: float = 0.03, tol: float = 1e-6,
+              max_iter: int = 1000) -> YTMResult:
+    """
+    Solves for the YTM of bond and reports how the solve went.
+
+    Runs Newton-Raphson from guess, evaluating price and derivative in one pass.
+    If a step diverges (a non-finite step, or the price error grows), falls back
+    to Brent's method on a bracketing interval.
+
+    === Parameters ===
+    - bond: the bond to solve for
+    - guess: the starting YTM, e.g. this bond's YTM on the previous price date
+    - tol: the step size (Newton) or interval width (Brent) treated as converged
+    - max_iter: the maximum number of Newton iterations
+    """
+    ytm = guess
+    with np.errstate(over="ignore", invalid="ignore"):
+        residual, d_residual = ytm_price_and_derivative(bond, ytm)
+        i = 0
+        while i < max_iter:
+            step = residual / d_residual
+            new_ytm = ytm - step
+            i += 1
+            if not np.isfinite(new_ytm):
+                break
+            new_residual, new_d_residual = ytm_price_and_derivative(bond, new_ytm)
+            if not np.isfinite(new_residual) or abs(new_residual) > abs(residual):
+                break
+            ytm, residual, d_residual = new_ytm, new_residual, new_d_residual
+            if np.abs(step) <= tol:
+                return YTMResult(ytm, i, residual, True, "newton")
+        else:
+            return YTMResult(ytm, i, residual, False, "newton")
+
+    bracket = _bracket_ytm(bond)
+    if bracket is None:
+        return YTMResult(ytm, i, residual, False, "newton")
+    ytm, info = scipy.optimize.brentq(lambda y: ytm_price(bond, y), *bracket,
+                                      xtol=tol, full_output=True, disp=False)
+    return YTMResult(ytm, i + info.iterations, ytm_price(bond, ytm), info.converged, "brent")
+
+
+def solve_ytm_series(bonds: list[DatedBond], tol: float = 1e-6,
+                     max_iter: int = 1000) -> list[YTMResult]:
+    """
+    Solves for the YTM of every bond in bonds, warm-starting each solve from the
+    last converged YTM of the same ISIN. Results are returned in the order of bonds.
+
+    === Prerequisites ===
+    - bonds sharing an ISIN appear in order of price date
+    """
+    last_ytm = {}
+    results = []
+    for bond in bonds:
+        result = solve_ytm(bond, last_ytm.get(bond.isin, 0.03), tol, max_iter)
+        if result.converged:
+            last_ytm[bond.isin] = result.ytm
+        results.append(result)
+    return results
+
+
+def cashflow_matrices(bonds: list[DatedBond] | BondTable) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds zero-padded cashflow matrices for bonds, one row per bond.
+
+    Returns (times, amounts, prices) where times[i] holds the cashflow times of
+    bonds[i] in years, amounts[i] the matching cashflows (coupons, then the
+    notional at maturity) and prices[i] the bond's price. Padding entries have
+    an amount of 0 so they do not contribute to any sum.
+    """
+    if isinstance(bonds, BondTable):
+        return bonds.cashflow_matrices()
+    width = max((len(bond.times) for bond in bonds), default=0)
+    times = np.zeros((len(bonds), width))
+    amounts = np.zeros((len(bonds), width))
+    prices = np.empty(len(bonds))
+    for i, bond in enumerate(bonds):
+        n = len(bond.times)
+        times[i, :n] = bond.times
+        amounts[i, :n] = bond.amounts
+        prices[i] = bond.price
+    return times, amounts, prices
+
+
+def batch_newton_raphson_ytm(times: np.ndarray, amounts: np.ndarray, prices: np.ndarray,
+                             guess: float = 0.03, tol: float = 1e-6,
+                             max_iter: int = 1000) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Solves for the YTM of many bonds at once using the Newton-Raphson method.
+
+    Every row is iterated together; a row stops updating once its step is finite
+    and within tol. A row whose step becomes NaN or infinite has diverged: it
+    stops updating and its YTM is NaN. Returns the YTM of each row, the number of
+    iterations it took and whether it converged, like YTMResult.converged.
+
+    === Parameters ===
+    - times: (N, M) cashflow times in years, as built by cashflow_matrices
+    - amounts: (N, M) cashflow amounts, zero where a row is padded
+    - prices: (N,) prices to match
+    - guess: the starting YTM for every row
+    - tol: the step size at which a row is considered converged
+    - max_iter: the maximum number of iterations per row
+    """
+    ytm = np.full(len(prices), guess, dtype=float)
+    iterations = np.zeros(len(prices), dtype=int)
+    converged = np.zeros(len(prices), dtype=bool)
+    diverged = np.zeros(len(prices), dtype=bool)
+    active = np.ones(len(prices), dtype=bool)
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        for _ in range(max_iter):
+            if not active.any():
+                break
+            t = times[active]
+            discounted = amounts[active] * np.exp(-ytm[active, None] * t)
+            price = discounted.sum(axis=1) - prices[active]
+            d_price = -(discounted * t).sum(axis=1)
+            step = price / d_price
+            ytm[active] -= step
+            iterations[active] += 1
+            finite = np.isfinite(step)
+            done = finite & (np.abs(step) <= tol)
+            converged[active] = done
+            diverged[active] = ~finite
+            active[active] = finite & ~done
+    ytm[diverged] = np.nan
+    return ytm, iterations, converged
+
+
+def cached_ytms(bonds: list[DatedBond] | BondTable, max_iter: int = 1000,
+                cache: YTMCache | None = None) -> np.ndarray:
+    """
+    Returns the YTM of every bond in bonds, solved together with
+    batch_newton_raphson_ytm. If a cache is given, yields found in it are reused
+    and the rest are cached once solved.
+    Yields that used every iteration are reported as newton_raphson_ytm does,
+    and those that diverged are reported separately and are NaN. Neither is cached.
+
+    The batch solver runs the same iteration as newton_raphson_ytm, so both
+    share cache entries.
+    """
+    ytms = np.empty(len(bonds))
+    if cache is None:
+        keys = [None] * len(bonds)
+        missing = list(range(len(bonds)))
+    else:
+        settings = ("newton", 0.03, 1e-6, max_iter)
+        if isinstance(bonds, BondTable):
+            periods = np.split(bonds.coupon_periods, bonds.offsets[1:-1]) if len(bonds) else []
+            keys = [YTMCache.row_key(*row, settings) for row in zip(bonds.isin, bonds.date, bonds.price, bonds.fv,
+                                                                    bonds.coupon, bonds.maturity_period, periods)]
+        else:
+            keys = [YTMCache.key(bond, settings) for bond in bonds]
+        missing = []
+        for i, key in enumerate(keys):
+            ytm = cache.get(key)
+            if ytm is None:
+                missing.append(i)
+            else:
+                ytms[i] = ytm
+    if missing:
+        if isinstance(bonds, BondTable):
+            times, amounts, prices = bonds.take(np.array(missing)).cashflow_matrices()
+        else:
+            times, amounts, prices = cashflow_matrices([bonds[i] for i in missing])
+        solved, iterations, converged = batch_newton_raphson_ytm(times, amounts, prices, max_iter=max_iter)
+        ytms[missing] = solved
+        diverged = np.isnan(solved)
+        for _ in range(int((~converged & ~diverged & (iterations == max_iter)).sum())):
+            print("Max number of iterations reached.")
+        for _ in range(int(diverged.sum())):
+            print("Newton-Raphson diverged.")
+        if cache is not None:
+            for i, ytm, ok in zip(missing, solved, converged):
+                if ok:
+                    cache.put(keys[i], float(ytm))
+    return ytms
+
+
+def compute_spread(gov: DatedBond | BondTable, com: DatedBond | BondTable,
+                   cache: YTMCache | None = None) -> float | np.ndarray:
     """
     Returns the spread in decimal between the government bond and the company bond.
     Formula: spread = company YTM - gov YTM
 
+    Given two BondTables, returns the spread of each pair of rows.
+    If a cache is given, the yields are memoized in it.
+
     === Prerequisites ===
     - gov bond and company bond mature at a similar time period
+    - tables have the same length
     """
-    gov_ytm = newton_raphson_ytm(gov)
-    com_ytm = newton_raphson_ytm(com)
+    if isinstance(gov, BondTable) or isinstance(com, BondTable):
+        return cached_ytms(com, cache=cache) - cached_ytms(gov, cache=cache)
+    gov_ytm, com_ytm = cached_ytms([gov, com], cache=cache)
     return com_ytm - gov_ytm
 
 
@@ -147,24 +646,87 @@ def get_dated_bonds(df: pd.DataFrame) -> list[DatedBond]:
     return sort_bond_list(bonds)
 
 
-def get_last_coupon_payment_date(row):
+def get_bond_table(df: pd.DataFrame) -> BondTable:
     """
-    Given a row containing the first coupon date and the price date,
-    returns the most recent coupon payment date.
+    Given a pandas DataFrame with the correct columns, returns a BondTable with the
+    rows sorted by price date, then maturity period, like get_dated_bonds.
+    """
+    periods = df["Coupon Periods"].tolist()
+    offsets = np.zeros(len(periods) + 1, dtype=int)
+    np.cumsum([len(p) for p in periods], out=offsets[1:])
+    table = BondTable(df["ISIN"].to_numpy(), df["FV"].to_numpy(), df["Coupon"].to_numpy()/2,
+                      df["Price Date"].to_numpy(), df["Dirty Price"].to_numpy(),
+                      df["Maturity Period"].to_numpy(),
+                      [p for row in periods for p in row], offsets)
+    return table.sorted_by_date()
+
+
+def coupon_schedules(start_dates: np.ndarray, maturity_dates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
     """
-    date = row["Coupon Start Date"]
-    while date + pd.DateOffset(months=6) < row["Price Date"]:
-        date = date + pd.DateOffset(months=6)
-    return date
+    Builds the semi-annual coupon schedule of every bond at once using integer month arithmetic.
 
-def get_future_coupon_payments(row):
-    date = row["Last Coupon Payment Date"] + pd.DateOffset(months=6)
-    periods = []
-    while date < row["Maturity Date"]:
-        period = (date - row["Price Date"]).days
-        periods.append(period)
-        date = date + pd.DateOffset(months=6)
-    return periods
+    Returns (dates, offsets) where the schedule of bond i is dates[offsets[i]:offsets[i+1]]:
+    its coupon start date stepped by 6 months up to and including the first date on or
+    after its maturity. As when stepping with pd.DateOffset(months=6), a day clamped to
+    the end of a short month stays clamped for the rest of the schedule.
+
+    === Parameters ===
+    - start_dates: the first coupon date of each bond
+    - maturity_dates: the maturity date of each bond
+    """
+    start = np.asarray(start_dates).astype("datetime64[D]")
+    maturity = np.asarray(maturity_dates).astype("datetime64[D]")
+    start_month = start.astype("datetime64[M]")
+    day = (start - start_month.astype("datetime64[D]")).astype(int) + 1
+    months_to_maturity = (maturity.astype("datetime64[M]") - start_month).astype(int)
+    width = max(int(np.max(months_to_maturity, initial=0)) // 6 + 2, 1)
+    steps = np.arange(width)
+    months = start_month[:, None] + 6*steps
+    month_len = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(int)
+    days = np.minimum.accumulate(np.minimum(day[:, None], month_len), axis=1)
+    dates = months.astype("datetime64[D]") + (days - 1)
+    counts = np.minimum((dates < maturity[:, None]).sum(axis=1) + 1, width)
+    offsets = np.zeros(len(start) + 1, dtype=int)
+    np.cumsum(counts, out=offsets[1:])
+    return dates[steps < counts[:, None]], offsets
+
+
+def offset_coupon_schedules(df: pd.DataFrame, date_column: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Offsets each ISIN's coupon schedule against the price date of every row of df.
+
+    Each ISIN's schedule is built once and shared by all of its rows. Returns
+    (last_coupon_dates, periods, offsets): the most recent coupon date of each row,
+    and the day counts from the row's price date to each remaining coupon date before
+    maturity, where row i's day counts are periods[offsets[i]:offsets[i+1]].
+
+    === Parameters ===
+    - df: rows with columns ISIN, Coupon Start Date, Maturity Date and date_column
+    - date_column: the column holding each row's price date
+    """
+    codes, isins = pd.factorize(df["ISIN"])
+    first = np.unique(codes, return_index=True)[1]
+    start = df["Coupon Start Date"].to_numpy()[first]
+    maturity = df["Maturity Date"].to_numpy().astype("datetime64[D]")
+    schedule, schedule_offsets = coupon_schedules(start, maturity[first])
+    price_dates = df[date_column].to_numpy().astype("datetime64[D]")
+
+    # Schedules are sorted within each ISIN, so tagging every date with its ISIN code
+    # gives one globally sorted key that a single searchsorted can offset against.
+    span = np.int64(1) << 32
+    segment = np.repeat(np.arange(len(isins)), np.diff(schedule_offsets))
+    keys = segment * span + schedule.astype(np.int64)
+    seg_start = schedule_offsets[codes]
+    first_on_or_after = np.searchsorted(keys, codes * span + price_dates.astype(np.int64))
+    last = np.maximum(first_on_or_after - 1, seg_start)
+    before_maturity = np.searchsorted(keys, codes * span + maturity.astype(np.int64))
+
+    counts = np.maximum(before_maturity - (last + 1), 0)
+    offsets = np.zeros(len(df) + 1, dtype=int)
+    np.cumsum(counts, out=offsets[1:])
+    index = np.repeat(last + 1 - offsets[:-1], counts) + np.arange(offsets[-1])
+    periods = (schedule[index] - np.repeat(price_dates, counts)).astype(np.int64)
+    return schedule[last], periods, offsets
 
 
 def consume_info_csv(info_filename: str) -> pd.DataFrame:
@@ -207,17 +769,29 @@ def consume_price_csv(filename: str, bond_info: pd.DataFrame) -> pd.DataFrame:
 
     # Construct needed columns
     df["Price"] = df["Price"] * df["FV"] / 100.0
-    df["Last Coupon Payment Date"] = df.apply(get_last_coupon_payment_date, axis=1)
-    df["Coupon Periods"] = df.apply(get_future_coupon_payments, axis=1)
+    last_coupon_dates, periods, offsets = offset_coupon_schedules(df, "Price Date")
+    df["Last Coupon Payment Date"] = last_coupon_dates.astype(df["Price Date"].dtype)
+    df["Coupon Periods"] = [p.tolist() for p in np.split(periods, offsets[1:-1])]
     df["Dirty Price"] = df["Price"] + (df["FV"] * df["Coupon"]/2.0) * (df["Price Date"] - df["Last Coupon Payment Date"]).dt.days / (365/2)
     df["Maturity Period"] = (df["Maturity Date"] - df["Price Date"]).dt.days
     
     return df
 
 
-def process_bond_data(info_filename: str, price_filename: str, save_filename: str|None=None) -> pd.DataFrame:
-    info = consume_info_csv(info_filename)
-    df = consume_price_csv(price_filename, info)
+def process_bond_data(info_filename: str, price_filename: str, save_filename: str|None=None,
+                      cache_dir: str|None=None) -> pd.DataFrame:
+    """
+    Builds the processed bond DataFrame from the info and price CSV files.
+    If cache_dir is given, the result is cached there and reused until either file changes.
+    """
+    def build() -> pd.DataFrame:
+        info = consume_info_csv(info_filename)
+        return consume_price_csv(price_filename, info)
+
+    if cache_dir is None:
+        df = build()
+    else:
+        df = cached_frame(cache_dir, [info_filename, price_filename], build)
     if save_filename is not None:
         df.to_csv(save_filename)
     
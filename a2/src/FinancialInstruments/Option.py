@@ -1,12 +1,22 @@
 import numpy as np
-import scipy
+from scipy.special import ndtr
 
 
 def N(x: float) -> float:
     """
     Returns the normal CDF at x.
+
+    Calls the ndtr ufunc directly, which gives the same values as
+    scipy.stats.norm.cdf without building a distribution on every call.
+    """
+    return ndtr(x)
+
+
+def n(x: float) -> float:
     """
-    return scipy.stats.norm.cdf(x)
+    Returns the normal PDF at x.
+    """
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
 
 
 class Option:
@@ -70,3 +80,78 @@ class Option:
         """
         d2 = self._d_vals()[1]
         return N(d2)
+
+
+class OptionBatch:
+    """
+    Many European call options priced together with NumPy arrays.
+
+    Inputs broadcast against each other, so scalars and arrays can be mixed.
+    d1, d2 and their normal CDFs are computed once on construction and shared
+    by every output.
+
+    === Attributes ===
+    - underlying_price: the prices of the underlying instruments
+    - strike_price: the strike prices of the options
+    - r: the risk-free interest rates
+    - t: the times to exercise
+    - volatility: the volatilities of the underlying assets
+    - d1: d1 of the Black-Scholes formula for each option
+    - d2: d2 of the Black-Scholes formula for each option
+    """
+    underlying_price: np.ndarray
+    strike_price: np.ndarray
+    r: np.ndarray
+    t: np.ndarray
+    volatility: np.ndarray
+    d1: np.ndarray
+    d2: np.ndarray
+
+    def __init__(self, underlying_price, strike_price, r, t, volatility) -> None:
+        V, K, r, t, v = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in
+                                              (underlying_price, strike_price, r, t, volatility)))
+        self.underlying_price = V
+        self.strike_price = K
+        self.r = r
+        self.t = t
+        self.volatility = v
+        self._discounted_strike = K * np.exp(-r * t)
+        self._sqrt_t = np.sqrt(t)
+        c = v * self._sqrt_t
+        self.d1 = (np.log(V / self._discounted_strike) + 0.5 * v**2 * t) / c
+        self.d2 = self.d1 - c
+        self._N_d1 = N(self.d1)
+        self._N_d2 = N(self.d2)
+
+    def __len__(self) -> int:
+        return self.d1.size
+
+    def price(self) -> np.ndarray:
+        """
+        Computes the price of each option.
+        """
+        return self.underlying_price * self._N_d1 - self._discounted_strike * self._N_d2
+
+    def delta(self) -> np.ndarray:
+        """
+        Computes the delta of each option.
+        """
+        return self._N_d1
+
+    def vega(self) -> np.ndarray:
+        """
+        Computes the sensitivity of each option's price to its volatility.
+        """
+        return self.underlying_price * n(self.d1) * self._sqrt_t
+
+    def get_probability_of_exercise(self) -> np.ndarray:
+        """
+        Computes the (risk-neutral) probability of exercising each option.
+        """
+        return self._N_d2
+
+    def evaluate(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns (price, delta, vega, probability of exercise) for every option.
+        """
+        return self.price(), self.delta(), self.vega(), self.get_probability_of_exercise()
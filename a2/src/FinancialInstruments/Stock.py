@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from src.DataCache.DataCache import cached_frame
 
 
 class Stock:
@@ -20,26 +21,30 @@ class DatedStock(Stock):
         self.date = date
         self.volatility = None
 
-    def compute_volatility(self, price_data: pd.DataFrame|str) -> None:
+    def compute_volatility(self, price_data: pd.DataFrame|str, cache_dir: str|None = None) -> None:
         """
         Computes the volatility of this stocks log interday returns.
 
         === Parameters ===
         - price_data: the daily historical price data for this stock.
                       Must have column "Price Date" and "Price".
+        - cache_dir: if price_data is a filename, where to cache the parsed prices
         """
         if isinstance(price_data, str):
-            price_data = consume_price_csv(price_data)
+            price_data = consume_price_csv(price_data, cache_dir)
         df = price_data
         df = df[df["Price Date"] <= pd.to_datetime(self.date)]
         interday_returns = np.log(df["Price"] / df["Price"].shift(1))
         self.volatility = interday_returns.std(ddof=0) * np.sqrt(252)
 
 
-def consume_price_csv(filename: str) -> pd.DataFrame:
+def consume_price_csv(filename: str, cache_dir: str|None = None) -> pd.DataFrame:
     """
     Constructs a historical price dataframe using the csv file found at filename.
+    If cache_dir is given, the result is cached there and reused until the file changes.
     """
+    if cache_dir is not None:
+        return cached_frame(cache_dir, [filename], lambda: consume_price_csv(filename))
     df = pd.read_csv(filename)
     try:
         df["Price Date"] = pd.to_datetime(df["Date"], format="%m/%d/%y")
@@ -2,8 +2,10 @@ import numpy as np
 import scipy
 import scipy.optimize
 from src.FinancialEntity.Company import Company, StockCompany
-from src.FinancialInstruments.Option import Option
-from src.FinancialInstruments.Bond import compute_spread
+from src.FinancialInstruments.Option import Option, OptionBatch, N, n
+from src.FinancialInstruments.Bond import DatedBond, YTMCache, compute_spread
+from src.FinancialModels.MonteCarlo import simulate_default_probs, MonteCarloResult, Vasicek
+from src.FinancialModels.Transition import check_transition_matrix, transition_powers
 
 
 class FinancialModel:
@@ -29,14 +31,37 @@ class CreditMetricsModel(FinancialModel):
     """
     A class representing the CreditMetrics model.
 
+    Without a transition matrix, the company moves between two states, solvent
+    and default, with the probability of staying solvent each year from get_q.
+    A K-state rating transition matrix (e.g. AAA, ..., D) can be given instead,
+    whose last state must be default.
+
     === Attributes ===
     - spread: the spread of the company from the government.
+    - transition_matrix: the annual rating transition matrix, or None for the two state model
+    - initial_state: the company's current state
+
+    Pass the same YTMCache to every model built on one government so its bond
+    yields are solved once.
     """
     spread: float | None
+    transition_matrix: np.ndarray | None
+    initial_state: int
 
-    def __init__(self, gov: Company, com: Company) -> None:
+    def __init__(self, gov: Company, com: Company, transition_matrix=None, initial_state: int = 0,
+                 cache: YTMCache | None = None) -> None:
         super().__init__(gov, com)
-        self.spread = self.get_spread()
+        self.spread = self.get_spread(cache)
+        self.transition_matrix = None
+        num_states = 2
+        if transition_matrix is not None:
+            self.transition_matrix = check_transition_matrix(transition_matrix)
+            if self.transition_matrix.ndim != 2:
+                raise ValueError("transition_matrix must be a single K x K matrix")
+            num_states = len(self.transition_matrix)
+        if not 0 <= initial_state < num_states - 1:
+            raise ValueError("initial_state must be a state other than default")
+        self.initial_state = initial_state
 
     def print_stats(self) -> None:
         """
@@ -46,11 +71,18 @@ class CreditMetricsModel(FinancialModel):
               f"Company: {self.company.name}\n" + 
               f"Recovery Rate: {self.company.get_recovery_rate()*100}%\n" +
               f"Spread: {round(self.spread/0.0001)}\n" +
-              f"Annual Default Probability: {round((1 - self.get_q())*100,2)}%")
+              f"Annual Default Probability: {round(self.get_transition_matrix()[self.initial_state, -1]*100,2)}%")
         
-    def get_spread(self) -> float:
+    def get_spread(self, cache: YTMCache | None = None) -> float:
         """
         Gets the spread of this company according to the government.
+        If a cache is given, the yields are memoized in it.
+        """
+        return compute_spread(self.get_nearest_government_bond(), self.company.bonds[0], cache)
+
+    def get_nearest_government_bond(self) -> DatedBond:
+        """
+        Gets the government bond maturing closest to this company's first bond.
         """
         c_bond = self.company.bonds[0]
         nearest_bond = None
@@ -59,7 +91,7 @@ class CreditMetricsModel(FinancialModel):
                 nearest_bond = bond
             if abs(bond.maturity_period - c_bond.maturity_period) < abs(nearest_bond.maturity_period - c_bond.maturity_period):
                 nearest_bond = bond
-        return compute_spread(nearest_bond, c_bond)
+        return nearest_bond
     
     def get_q(self):
         """
@@ -68,19 +100,23 @@ class CreditMetricsModel(FinancialModel):
         h = self.spread
         R = self.company.get_recovery_rate()
         return (np.exp(-h) - R) / (1 - R)
+
+    def get_transition_matrix(self) -> np.ndarray:
+        """
+        Gets the annual transition matrix: the one given, or else the solvent/default
+        matrix from get_q.
+        """
+        if self.transition_matrix is not None:
+            return self.transition_matrix
+        q = self.get_q()
+        return np.array([[q, 1-q], [0, 1]])
     
     def get_annual_default_probs(self, num_years: int) -> list:
         """
-        Gets the annual default probability for each year in [1, num_years].
+        Gets the probability of having defaulted by each year in [1, num_years].
         """
-        q = self.get_q()
-        M = np.array([[q, 1-q],[0,1]])
-        A = M
-        default_probs = []
-        for _ in range(num_years):
-            default_probs.append(A[0,1])
-            A = A @ M
-        return default_probs
+        M = self.get_transition_matrix()
+        return list(transition_powers(M, num_years, check=self.transition_matrix is not None)[:, self.initial_state, -1])
 
 
 
@@ -93,7 +129,118 @@ def volatility_equation(vs: float, V: float, S: float, delta: float) -> float:
     - delta = option delta
     v_v = v_S * S / delta / V
     """
-    return vs * S * delta / V
+    return vs * S / delta / V
+
+
+class MertonCalibration:
+    """
+    The asset values solved by calibrate_merton for a batch of companies.
+
+    === Attributes ===
+    - assets: the market value of each company's assets, V
+    - asset_volatility: the volatility of each company's assets, sigma_V
+    - iterations: the Newton iterations each company needed
+    - residual: the larger of each company's two relative equation errors
+    - converged: whether each company met the tolerance
+    """
+    __slots__ = ("assets", "asset_volatility", "iterations", "residual", "converged")
+    assets: np.ndarray
+    asset_volatility: np.ndarray
+    iterations: np.ndarray
+    residual: np.ndarray
+    converged: np.ndarray
+
+    def __init__(self, assets: np.ndarray, asset_volatility: np.ndarray, iterations: np.ndarray,
+                 residual: np.ndarray, converged: np.ndarray) -> None:
+        self.assets = assets
+        self.asset_volatility = asset_volatility
+        self.iterations = iterations
+        self.residual = residual
+        self.converged = converged
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+
+def _merton_residuals(V, sigma_V, S, sigma_S, A, t):
+    """
+    The two Merton equations and their Jacobian, for arrays of companies.
+
+    With d1 and d2 the Black-Scholes values for a call on V struck at the
+    discounted debt A:
+    - F1 = V N(d1) - A N(d2) - S
+    - F2 = N(d1) sigma_V V - sigma_S S
+    """
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(V / A) + 0.5 * sigma_V**2 * t) / (sigma_V * sqrt_t)
+    d2 = d1 - sigma_V * sqrt_t
+    N_d1, pdf_d1 = N(d1), n(d1)
+    F1 = V * N_d1 - A * N(d2) - S
+    F2 = N_d1 * sigma_V * V - sigma_S * S
+    J11 = N_d1
+    J12 = V * pdf_d1 * sqrt_t
+    J21 = sigma_V * N_d1 + pdf_d1 / sqrt_t
+    J22 = V * (N_d1 - pdf_d1 * d2)
+    return F1, F2, J11, J12, J21, J22
+
+
+def calibrate_merton(equity, equity_volatility, debt, r, t=1.0, assets=None, asset_volatility=None,
+                     tol: float = 1e-10, max_iter: int = 100) -> MertonCalibration:
+    """
+    Solves the Merton equations for the assets V and asset volatility sigma_V
+    of every company at once:
+    - S = V N(d1) - K e^(-rt) N(d2)     (equity is a call on the assets)
+    - sigma_S S = N(d1) sigma_V V       (equity and asset volatility agree)
+
+    Uses Newton's method with the closed-form Jacobian, updating only the
+    companies that have not converged yet. Steps that would make V or sigma_V
+    non-positive are halved until they do not.
+
+    === Parameters ===
+    - equity: each company's equity, S
+    - equity_volatility: each company's equity volatility, sigma_S
+    - debt: each company's debt, K
+    - r: the risk-free rate for each company
+    - t: the time horizon in years
+    - assets: starting values for V, defaults to S + K e^(-rt)
+    - asset_volatility: starting values for sigma_V, defaults to sigma_S S / V
+    - tol: the tolerance on each equation, relative to S and sigma_S S
+    - max_iter: the maximum number of Newton iterations
+    """
+    S, sigma_S, K, r, t = np.broadcast_arrays(*(np.asarray(x, dtype=float)
+                                                for x in (equity, equity_volatility, debt, r, t)))
+    S, sigma_S, K, r, t = (x.ravel() for x in (S, sigma_S, K, r, t))
+    A = K * np.exp(-r * t)
+    V = (S + A if assets is None else np.broadcast_to(np.asarray(assets, dtype=float), S.shape)).copy()
+    sigma_V = (sigma_S * S / V if asset_volatility is None
+               else np.broadcast_to(np.asarray(asset_volatility, dtype=float), S.shape)).copy()
+    iterations = np.zeros(len(S), dtype=int)
+    residual = np.full(len(S), np.inf)
+    active = np.ones(len(S), dtype=bool)
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        for _ in range(max_iter + 1):
+            idx = np.flatnonzero(active)
+            F1, F2, J11, J12, J21, J22 = _merton_residuals(V[idx], sigma_V[idx], S[idx], sigma_S[idx], A[idx], t[idx])
+            residual[idx] = np.maximum(np.abs(F1) / S[idx], np.abs(F2) / (sigma_S[idx] * S[idx]))
+            done = residual[idx] <= tol
+            active[idx[done]] = False
+            if not active.any() or _ == max_iter:
+                break
+            keep = ~done
+            idx, F1, F2, J11, J12, J21, J22 = (x[keep] for x in (idx, F1, F2, J11, J12, J21, J22))
+            det = J11 * J22 - J12 * J21
+            dV = (J22 * F1 - J12 * F2) / det
+            dsigma = (J11 * F2 - J21 * F1) / det
+            scale = np.ones(len(idx))
+            for _halving in range(30):
+                bad = (V[idx] - scale * dV <= 0) | (sigma_V[idx] - scale * dsigma <= 0)
+                if not bad.any():
+                    break
+                scale[bad] *= 0.5
+            V[idx] -= scale * dV
+            sigma_V[idx] -= scale * dsigma
+            iterations[idx] += 1
+    return MertonCalibration(V, sigma_V, iterations, residual, ~active)
 
 
 def cumulative_probability(X_probs: list[float]) -> list[float]:
@@ -111,9 +258,15 @@ def cumulative_probability(X_probs: list[float]) -> list[float]:
 class MertonModel(FinancialModel):
     """
     A class representing the Merton model for credit risk.
+
+    The calibrated asset values are cached, and only solved again when one of
+    the inputs they depend on changes: the company's equity, equity volatility,
+    debt or reported assets, or the government's one year rate.
     """
     def __init__(self, government: Company, company: StockCompany) -> None:
         super().__init__(government, company)
+        self._calibration = None
+        self._calibration_inputs = None
 
     def print_stats(self) -> None:
         """
@@ -148,11 +301,28 @@ class MertonModel(FinancialModel):
         return [S_calculated - self.company.equity, sigma_V_calculated - sigma_V]
 
     def find_asset_vals(self) -> list[float]:
+        """
+        Returns the asset value and asset volatility for this company, solving
+        for them only if the inputs changed since the last call.
+        """
+        inputs = (self.company.equity, self.company.stock.volatility, self.company.debt,
+                  self.company.assets, self.government.rates[365])
+        if inputs != self._calibration_inputs:
+            self._calibration = self._solve_asset_vals()
+            self._calibration_inputs = inputs
+        return list(self._calibration)
+
+    def _solve_asset_vals(self) -> list[float]:
         """
         Computes the asset values for this company by simultaneously solving
-        the fixed point equations.
+        the fixed point equations, falling back to fsolve if Newton's method
+        does not converge.
         """
         initial_guesses = [self.company.assets, self.company.stock.volatility]
+        result = calibrate_merton(self.company.equity, self.company.stock.volatility, self.company.debt,
+                                  self.government.rates[365], 1.0, *initial_guesses)
+        if result.converged[0]:
+            return [result.assets[0], result.asset_volatility[0]]
         return scipy.optimize.fsolve(self.fixed_point_equations, initial_guesses, args=(self.company.stock.volatility))
 
     def get_default_probs(self, num_years: int) -> list[float]:
@@ -160,17 +330,26 @@ class MertonModel(FinancialModel):
         Get the default probability of this company for each year in [1, num_years].
         """
         assets, asset_volatility = self.find_asset_vals()
-        option = Option(
-            assets,
-            self.company.debt,
-            0.0,
-            0.0,
-            asset_volatility
-        )
-        survival_probs = []
-        for y in range(1, num_years+1):
-            option.r = self.government.rates[y*365]
-            option.t = y
-            survival_probs.append(option.get_probability_of_exercise())
-        default_probs = cumulative_probability(survival_probs)
-        return default_probs
\ No newline at end of file
+        years = np.arange(1, num_years+1)
+        rates = self.government.rates.get_many(years*365)
+        options = OptionBatch(assets, self.company.debt, rates, years, asset_volatility)
+        return list(1. - np.cumprod(options.get_probability_of_exercise()))
+
+    def simulate_default_probs(self, num_years: int, num_paths: int = 100_000, steps_per_year: int = 12,
+                               seed: int | None = None, vasicek: Vasicek | None = None,
+                               **kwargs) -> MonteCarloResult:
+        """
+        Estimates terminal and first passage default probabilities for each year in
+        [1, num_years] by Monte Carlo, from the calibrated asset values and the
+        government curve. Other keyword arguments go to simulate_default_probs.
+
+        The terminal estimates for year y are comparable to the closed form
+        probability of not exercising at y, and 1 - cumprod(1 - terminal) to
+        get_default_probs.
+        """
+        assets, asset_volatility = self.find_asset_vals()
+        times = np.arange(1, num_years*steps_per_year + 1) / steps_per_year
+        spot_rates = None if vasicek is not None else self.government.rates.get_many(times*365)
+        return simulate_default_probs(assets, asset_volatility, self.company.debt, np.arange(1, num_years+1),
+                                      spot_rates, num_paths, steps_per_year, seed=seed, vasicek=vasicek,
+                                      **kwargs)
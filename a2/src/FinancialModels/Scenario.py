@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from src.FinancialInstruments.Option import OptionBatch
+from src.FinancialModels.FinancialModel import MertonModel, CreditMetricsModel, calibrate_merton
+
+SHOCKS = ("debt", "equity", "volatility", "parallel", "twist", "recovery")
+
+
+def curve_shift(years, parallel, twist, pivot: float = 1.0) -> np.ndarray:
+    """
+    The change in a rate of maturity years under a parallel shift and a twist:
+        parallel + twist * (years - pivot)
+    so a twist rotates the curve about the pivot maturity. Inputs broadcast.
+    """
+    return np.asarray(parallel) + np.asarray(twist) * (np.asarray(years) - pivot)
+
+
+class ScenarioResult:
+    """
+    Default term structures over a Cartesian grid of shocks, from run_scenarios.
+
+    Both probability arrays have one axis per shock, in the order of SHOCKS,
+    then one for the year, so merton[i, j, k, l, m, n, y - 1] is the Merton
+    default probability by year y under debt[i], equity[j], ..., recovery[n].
+    Merton does not depend on the recovery rate and CreditMetrics only depends
+    on the curve and recovery shocks, so each is repeated along the other axes.
+
+    Merton probabilities are NaN for scenarios whose calibration did not
+    converge (see converged), and CreditMetrics probabilities are NaN where the
+    shocked spread gives an annual survival probability q outside [0, 1].
+
+    === Attributes ===
+    - shocks: the values along each shock axis, by name
+    - years: the years of the last axis
+    - merton: the Merton default probabilities
+    - credit_metrics: the CreditMetrics default probabilities
+    - converged: whether the Merton calibration converged, one per scenario (no year axis)
+    """
+    __slots__ = ("shocks", "years", "merton", "credit_metrics", "converged")
+    shocks: dict[str, np.ndarray]
+    years: np.ndarray
+    merton: np.ndarray
+    credit_metrics: np.ndarray
+    converged: np.ndarray
+
+    def __init__(self, shocks: dict[str, np.ndarray], years: np.ndarray, merton: np.ndarray,
+                 credit_metrics: np.ndarray, converged: np.ndarray) -> None:
+        self.shocks = shocks
+        self.years = years
+        self.merton = merton
+        self.credit_metrics = credit_metrics
+        self.converged = converged
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """
+        The number of values along each shock axis.
+        """
+        return tuple(len(self.shocks[name]) for name in SHOCKS)
+
+    def __len__(self) -> int:
+        return int(np.prod(self.shape))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        The results in long form: one row per scenario and year, with a column
+        for each shock, the year, and each model's default probability.
+        """
+        axes = [self.shocks[name] for name in SHOCKS] + [self.years]
+        grid = np.meshgrid(*axes, indexing="ij")
+        columns = {name: g.ravel() for name, g in zip(SHOCKS + ("year",), grid)}
+        columns["merton"] = self.merton.ravel()
+        columns["credit_metrics"] = self.credit_metrics.ravel()
+        return pd.DataFrame(columns)
+
+
+def run_scenarios(merton: MertonModel, credit_metrics: CreditMetricsModel, num_years: int,
+                  debt=(1.0,), equity=(1.0,), volatility=(1.0,), parallel=(0.0,), twist=(0.0,),
+                  recovery=None, pivot: float = 1.0, company_rates_move: bool = True,
+                  tol: float = 1e-10, max_iter: int = 100) -> ScenarioResult:
+    """
+    Evaluates the Merton and CreditMetrics default probabilities for each year
+    in [1, num_years] under every combination of the shocks.
+
+    All Merton scenarios are calibrated together by calibrate_merton, each
+    starting from the base calibration of merton moved by the scenario's change
+    in equity and discounted debt, and the term structures of every scenario
+    come from one OptionBatch.
+
+    By default the company's yields move with the government curve, so the
+    CreditMetrics spread, and with it the CreditMetrics default probabilities,
+    only respond to the recovery shocks. With company_rates_move False the
+    company's yields are held fixed instead, so the spread changes by minus
+    the shift at the maturity of the government bond it is measured against,
+    and a rise in government rates lowers CreditMetrics default risk. Only the
+    two state CreditMetrics model, without a rating transition matrix, is
+    supported.
+
+    === Parameters ===
+    - merton: the base Merton model
+    - credit_metrics: the base CreditMetrics model
+    - num_years: the number of years of each term structure
+    - debt: factors to scale the company's debt by
+    - equity: factors to scale the company's equity by
+    - volatility: factors to scale the stock's volatility by
+    - parallel: shifts added to every government rate, in decimal
+    - twist: changes in government rates per year of maturity away from pivot, in decimal
+    - recovery: recovery rates in [0, 1), defaults to the company's own
+    - pivot: the maturity in years a twist leaves unchanged
+    - company_rates_move: whether curve shocks also shift the company's yields
+    - tol, max_iter: passed to calibrate_merton
+    """
+    if credit_metrics.transition_matrix is not None:
+        raise ValueError("scenarios need the two state CreditMetrics model")
+    company = merton.company
+    if recovery is None:
+        recovery = (credit_metrics.company.get_recovery_rate(),)
+    shocks = {name: np.asarray(values, dtype=float).ravel() for name, values in
+              zip(SHOCKS, (debt, equity, volatility, parallel, twist, recovery))}
+    if np.any((shocks["recovery"] < 0) | (shocks["recovery"] >= 1)):
+        raise ValueError("recovery rates must lie in [0, 1)")
+    years = np.arange(1, num_years+1)
+    shape = tuple(len(shocks[name]) for name in SHOCKS)
+
+    # Merton: every combination of the first five shocks, flattened.
+    d, e, v, p, w = (g.ravel() for g in np.meshgrid(*(shocks[name] for name in SHOCKS[:5]), indexing="ij"))
+    K = company.debt * d
+    S = company.equity * e
+    sigma_S = company.stock.volatility * v
+    base_r = merton.government.rates[365]
+    r = base_r + curve_shift(1.0, p, w, pivot)
+    base_V, base_sigma_V = merton.find_asset_vals()
+    V = base_V + (S - company.equity) + (K * np.exp(-r) - company.debt * np.exp(-base_r))
+    V = np.where(V > 0, V, S + K * np.exp(-r))
+    guess_sigma_V = base_sigma_V * (sigma_S * S) / (company.stock.volatility * company.equity) * base_V / V
+    calibration = calibrate_merton(S, sigma_S, K, r, 1.0, V, guess_sigma_V, tol, max_iter)
+    rates = np.asarray(merton.government.rates.get_many(years*365), dtype=float)
+    shifted = rates + curve_shift(years, p[:, None], w[:, None], pivot)
+    options = OptionBatch(calibration.assets[:, None], K[:, None], shifted, years,
+                          calibration.asset_volatility[:, None])
+    merton_probs = 1. - np.cumprod(options.get_probability_of_exercise(), axis=1)
+    merton_probs[~calibration.converged] = np.nan
+    merton_probs = merton_probs.reshape(shape[:5] + (1, num_years))
+    converged = calibration.converged.reshape(shape[:5] + (1,))
+
+    # CreditMetrics: depends only on the curve shocks and the recovery rate.
+    h = np.full((len(shocks["parallel"]), len(shocks["twist"]), 1), credit_metrics.spread)
+    if not company_rates_move:
+        maturity = credit_metrics.get_nearest_government_bond().maturity_period / 365
+        h = h - curve_shift(maturity, shocks["parallel"][:, None, None], shocks["twist"][None, :, None], pivot)
+    R = shocks["recovery"][None, None, :]
+    q = (np.exp(-h) - R) / (1 - R)
+    q = np.where((q >= 0) & (q <= 1), q, np.nan)
+    cm_probs = 1. - q[..., None] ** years
+    cm_probs = cm_probs.reshape((1, 1, 1) + shape[3:] + (num_years,))
+
+    full = shape + (num_years,)
+    return ScenarioResult(shocks, years, np.broadcast_to(merton_probs, full),
+                          np.broadcast_to(cm_probs, full), np.broadcast_to(converged, shape))
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+def check_transition_matrix(matrices, tol: float = 1e-8) -> np.ndarray:
+    """
+    Returns matrices as a float array after checking that each is a rating
+    transition matrix: square, non-negative, with rows summing to 1, and with
+    the last state (default) absorbing.
+
+    matrices has shape (K, K), or (..., K, K) for a batch of matrices.
+    """
+    M = np.asarray(matrices, dtype=float)
+    if M.ndim < 2 or M.shape[-1] != M.shape[-2] or M.shape[-1] < 2:
+        raise ValueError("transition matrices must be square with at least two states")
+    if np.any(M < 0) or not np.all(np.isfinite(M)):
+        raise ValueError("transition probabilities must be finite and non-negative")
+    if np.any(np.abs(M.sum(axis=-1) - 1) > tol):
+        raise ValueError("each row of a transition matrix must sum to 1")
+    if np.any(np.abs(M[..., -1, -1] - 1) > tol):
+        raise ValueError("the last state (default) must be absorbing")
+    return M
+
+
+def transition_powers(matrices, num_years: int, check: bool = True) -> np.ndarray:
+    """
+    Returns M^1, ..., M^num_years for each transition matrix M, with shape
+    (..., num_years, K, K).
+
+    The powers are built by doubling: once M^1..M^m are known, M^(m+1)..M^2m
+    are M^1..M^m times M^m in one batched product, so only log2(num_years)
+    products are needed however many matrices there are.
+
+    Set check to False to skip check_transition_matrix.
+    """
+    M = check_transition_matrix(matrices) if check else np.asarray(matrices, dtype=float)
+    K = M.shape[-1]
+    powers = np.empty(M.shape[:-2] + (num_years, K, K))
+    if num_years == 0:
+        return powers
+    powers[..., 0, :, :] = M
+    m = 1
+    while m < num_years:
+        count = min(m, num_years - m)
+        np.matmul(powers[..., :count, :, :], powers[..., m-1:m, :, :],
+                  out=powers[..., m:m+count, :, :])
+        m += count
+    return powers
+
+
+def default_probs(matrices, num_years: int, initial_state=0) -> np.ndarray:
+    """
+    Returns the probability of having defaulted by each year in [1, num_years],
+    starting from initial_state, with shape (..., num_years).
+
+    === Parameters ===
+    - matrices: a (K, K) transition matrix or a (..., K, K) batch of them
+    - num_years: the number of years
+    - initial_state: the starting state, or one per matrix in the batch
+    """
+    to_default = transition_powers(matrices, num_years)[..., -1]
+    state = np.asarray(initial_state)
+    if state.ndim == 0:
+        return to_default[..., int(state)]
+    return np.take_along_axis(to_default, state[..., None, None], axis=-1)[..., 0]
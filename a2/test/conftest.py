@@ -0,0 +1,52 @@
+import os
+import sys
+test_directory = os.path.dirname(__file__)
+sys.path.append(os.path.join(test_directory, '..'))
+import pytest
+from src.FinancialInstruments.Bond import DatedBond
+from src.FinancialInstruments.Stock import DatedStock
+from src.FinancialEntity.Company import Company, StockCompany
+from src.FinancialModels.FinancialModel import MertonModel, CreditMetricsModel
+
+
+@pytest.fixture
+def curve_bonds() -> list[DatedBond]:
+    """
+    Four coupon bonds priced on one date, in bootstrap order.
+    """
+    return [DatedBond("CRV1", 100.0, 0.01, "2024-04-10", 100.5, 140, []),
+            DatedBond("CRV2", 100.0, 0.0125, "2024-04-10", 99.2, 325, [140]),
+            DatedBond("CRV3", 100.0, 0.0175, "2024-04-10", 98.1, 874, [139, 324, 505, 689]),
+            DatedBond("CRV4", 100.0, 0.02, "2024-04-10", 97.5, 1240, [140, 325, 506, 690, 871, 1055])]
+
+
+@pytest.fixture
+def government() -> Company:
+    """
+    A government with bootstrapped rates from two zero coupon bonds.
+    """
+    gov = Company("Gov", [DatedBond("GOV1", 100.0, 0.0, "2024-04-10", 96.0, 365, []),
+                          DatedBond("GOV2", 100.0, 0.0, "2024-04-10", 85.0, 1825, [])])
+    gov.compute_rates()
+    return gov
+
+
+@pytest.fixture
+def stock_company() -> StockCompany:
+    """
+    A company with one zero coupon bond and a stock of volatility 35%.
+    """
+    stock = DatedStock(100.0, "2024-04-10", 30.0)
+    stock.volatility = 0.35
+    bonds = [DatedBond("CORP1", 100.0, 0.0, "2024-04-10", 93.0, 365, [])]
+    return StockCompany("C", bonds, stock, 7000.0, 3000.0, 4000.0)
+
+
+@pytest.fixture
+def merton_model(government, stock_company) -> MertonModel:
+    return MertonModel(government, stock_company)
+
+
+@pytest.fixture
+def credit_metrics_model(government, stock_company) -> CreditMetricsModel:
+    return CreditMetricsModel(government, stock_company)
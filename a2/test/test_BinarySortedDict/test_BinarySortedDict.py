@@ -66,3 +66,138 @@ def test_bsd():
     assert bsd.return_sorted_list() == [5,6]
     bsd[1] = 6
     assert bsd.get_closest_keys(3) == [1,5]
+
+def test_compiled_curve():
+    bsd = src.BinarySortedDict()
+    bsd[10] = 0.3
+    bsd[2] = 0.1
+    bsd[6] = 0.2
+    curve = bsd.compile()
+    assert len(curve) == 3
+    assert list(curve) == [2, 6, 10]
+    assert curve.sorted_key_vals() == bsd.sorted_key_vals()
+    assert curve == bsd
+    assert 6 in curve and 5 not in curve
+    assert curve[6] == 0.2
+    assert curve.get_closest_keys(6) == [2, 10]
+    assert curve.get_closest_keys(1) == [None, 2]
+    assert curve.get_closest_keys(11) == [10, None]
+    for key in [0, 2, 3, 6, 8, 10, 12]:
+        assert abs(curve.linearly_interpolate(key) - bsd.linearly_interpolate(key)) < TOL
+    try:
+        curve.keys = np.array([1])
+        assert False
+    except AttributeError:
+        pass
+    assert not curve.values.flags.writeable
+    assert abs(curve[4] - 0.15) < TOL
+
+def test_compiled_curve_scalar_queries():
+    bsd = src.BinarySortedDict()
+    for key in range(0, 300, 3):
+        bsd[key / 10] = key / 1000
+    curve = bsd.compile()
+    keys = [key / 7 for key in range(200)]
+    queries = [lambda c: [c.linearly_interpolate(k) for k in keys],
+               lambda c: [c[3.0] for k in keys],
+               lambda c: [c.get_closest_keys(k) for k in keys]]
+    for query in queries:
+        assert query(curve) == query(bsd)
+
+def test_interpolate_many():
+    bsd = src.BinarySortedDict()
+    assert np.all(np.isnan(bsd.linearly_interpolate_many([1, 2])))
+    bsd[10] = 0.3
+    bsd[2] = 0.1
+    bsd[6] = 0.2
+    keys = np.array([0, 2, 3, 5.5, 6, 8, 10, 12])
+    expected = [bsd.linearly_interpolate(k) for k in keys]
+    for result in [bsd.linearly_interpolate_many(keys), bsd.compile().linearly_interpolate_many(keys)]:
+        assert result.shape == keys.shape
+        assert np.all(np.abs(result - expected) < TOL)
+    assert np.all(bsd.get_many([2, 6, 10]) == [0.1, 0.2, 0.3])
+    assert abs(bsd.get_many([4])[0] - 0.15) < TOL
+
+def test_sorted_key_index():
+    index = src.SortedKeyIndex()
+    assert index.is_empty()
+    for key in [10, 11, 9, 6, 8, 7, 4, 5, 6]:
+        index.insert(key)
+    assert index.in_order_traversal() == [4,5,6,7,8,9,10,11]
+    index.delete(6)
+    assert list(index) == [4,5,7,8,9,10,11]
+    assert index.get_closest_below(6) == 5 and index.get_closest_above(6) == 7
+    assert index.get_closest_below(4) is None and index.get_closest_above(11) is None
+
+def test_bsd_long_ascending():
+    bsd = src.BinarySortedDict()
+    n = 5000
+    for key in range(n):
+        bsd[key] = key / n
+    assert bsd.return_sorted_list() == list(range(n))
+    x, y = bsd.sorted_key_vals()
+    assert x[-1] == n - 1 and abs(y[-1] - (n - 1) / n) < TOL
+    assert bsd.get_closest_keys(2500.5) == [2500, 2501]
+    bsd[2500] = 0.0
+    assert bsd.sorted_key_vals()[1][2500] == 0.0
+    del bsd[2500]
+    assert 2500 not in bsd and bsd.get_closest_keys(2500) == [2499, 2501]
+
+def test_bst_deep_traversal():
+    bst = src.BinarySearchTree()
+    for key in range(3000):
+        bst.insert(key)
+    assert bst.in_order_traversal() == list(range(3000))
+
+def test_bst_delete():
+    bst = src.BinarySearchTree(10)
+    for key in [5, 3, 7]:
+        bst.insert(key)
+    bst.delete(10)
+    assert bst.in_order_traversal() == [3, 5, 7] and bst._root == 5
+    bst.delete(5)
+    assert bst.in_order_traversal() == [3, 7]
+    bst.delete(4)
+    assert bst.in_order_traversal() == [3, 7]
+    bst.insert(0)
+    assert bst.get_closest_below(3) == 0 and bst.get_closest_above(-1) == 0
+
+def test_bst_deep_delete():
+    bst = src.BinarySearchTree()
+    for key in range(3000):
+        bst.insert(key)
+    for key in [2999, 1500, 0]:
+        bst.delete(key)
+    assert bst.in_order_traversal() == [k for k in range(1, 2999) if k != 1500]
+    assert bst.get_closest_below(1501) == 1499 and bst.get_closest_above(1499) == 1501
+    other = src.BinarySearchTree()
+    for key in bst:
+        other.insert(key)
+    assert bst == other
+
+def test_sorted_key_vals_cached():
+    bsd = src.BinarySortedDict()
+    bsd[2] = 0.1
+    bsd[6] = 0.2
+    x, y = bsd.sorted_key_vals()
+    assert bsd.sorted_key_vals()[0] is x and bsd.sorted_key_vals()[1] is y
+    bsd[4] = 0.15
+    assert bsd.sorted_key_vals() == ([2, 4, 6], [0.1, 0.15, 0.2]) and x == [2, 6]
+
+def test_derived_points():
+    bsd = src.BinarySortedDict()
+    bsd[2] = 0.1
+    bsd[10] = 0.3
+    bsd.set_derived(6, 0.2)
+    assert bsd.derived == {6}
+    assert bsd.knots() == ([2, 10], [0.1, 0.3])
+    assert bsd.sorted_key_vals() == ([2, 6, 10], [0.1, 0.2, 0.3])
+    curve = bsd.compile()
+    assert curve.knots() == ([2, 10], [0.1, 0.3])
+    assert not curve.derived.flags.writeable
+    bsd.linearly_interpolate_many([1, 3, 4, 11])
+    assert len(bsd) == 3
+    bsd[6] = 0.25
+    assert bsd.derived == set()
+    del bsd[6]
+    assert bsd.knots() == ([2, 10], [0.1, 0.3])
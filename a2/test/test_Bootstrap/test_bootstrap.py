@@ -4,9 +4,11 @@ test_directory = os.path.dirname(__file__)
 src_dir = os.path.join(test_directory, '..', '..')
 sys.path.append(src_dir)
 import numpy as np
+import pytest
 from src.BinarySortedDict.BinarySortedDict import BinarySortedDict
-from src.FinancialInstruments.Bond import DatedBond
-from src.Bootstrapper.bootstrap import bootstrap
+from src.FinancialInstruments.Bond import DatedBond, BondTable
+from src.Bootstrapper.bootstrap import bootstrap, bootstrap_matrix, bootstrap_dates, IncrementalBootstrap
+from src.FinancialEntity.Company import Company
 
 TOL = 1e-6
 
@@ -27,4 +29,118 @@ class TestBootstrap:
             assert abs(result_y[i] - exp_y[i]) < TOL
     
     def test_two_period(self):
-        pass
\ No newline at end of file
+        pass
+    def test_bond_table(self, curve_bonds):
+        bonds = curve_bonds[:3]
+        expected = bootstrap(bonds)
+        result = bootstrap(BondTable.from_bonds(bonds))
+        exp_x, exp_y = expected.sorted_key_vals()
+        result_x, result_y = result.sorted_key_vals()
+        assert result_x == exp_x
+        assert np.allclose(result_y, exp_y, atol=TOL)
+
+    def test_matrix_matches_sequential(self, curve_bonds):
+        bonds = curve_bonds
+        expected_x, expected_y = bootstrap(bonds).sorted_key_vals()
+        for table in [bonds, BondTable.from_bonds(bonds)]:
+            result_x, result_y = bootstrap_matrix(table).sorted_key_vals()
+            assert result_x == expected_x
+            assert np.allclose(result_y, expected_y, atol=1e-12)
+        annual_x, annual_y = bootstrap_matrix(bonds, compounding_period=1).sorted_key_vals()
+        assert annual_x == expected_x
+        assert abs(np.log1p(annual_y[0]) - expected_y[0]) < 1e-12
+
+    def test_matrix_staggered_coupons(self):
+        bonds = [DatedBond("STG1", 100.0, 0.0, "2024-04-10", 99.1, 90, []),
+                 DatedBond("STG2", 100.0, 0.01, "2024-04-10", 99.4, 250, [70])]
+        for k in range(3, 11):
+            maturity = 180 * k + 17 * k
+            coupons = list(range(maturity - 180, 0, -180))[::-1]
+            bonds.append(DatedBond(f"STG{k}", 100.0, 0.005 * k, "2024-04-10", 97.0 + k / 4, maturity, coupons))
+        expected = bootstrap(bonds)
+        result = bootstrap_matrix(bonds)
+        exp_x, exp_y = expected.sorted_key_vals()
+        result_x, result_y = result.sorted_key_vals()
+        assert result_x == exp_x and len(exp_x) > 2 * len(bonds)
+        assert np.allclose(result_y, exp_y, rtol=0, atol=1e-12)
+        assert result.derived == expected.derived
+
+    def test_coupon_before_first_point(self):
+        bonds = [DatedBond("ERR1", 100.0, 0.01, "2024-04-10", 99.4, 250, [70])]
+        with pytest.raises(ValueError):
+            bootstrap(bonds)
+        with pytest.raises(ValueError):
+            bootstrap_matrix(bonds)
+
+    def test_dates_parallel(self, curve_bonds):
+        bonds = curve_bonds[:2] + [DatedBond("CRV1", 100.0, 0.01, "2024-04-11", 100.4, 139, []),
+                                   DatedBond("CRV2", 100.0, 0.0125, "2024-04-11", 99.3, 324, [139]),
+                                   DatedBond("CRV3", 100.0, 0.0175, "2024-04-11", 98.0, 873, [139, 324, 505, 689])]
+        dates = ["2024-04-11", "2024-04-10"]
+        expected = bootstrap_dates(bonds, dates)
+        assert expected[0].sorted_key_vals() == bootstrap(bonds[2:]).sorted_key_vals()
+        result = bootstrap_dates(BondTable.from_bonds(bonds), dates, jobs=2)
+        for e, r in zip(expected, result):
+            exp_x, exp_y = e.sorted_key_vals()
+            result_x, result_y = r.sorted_key_vals()
+            assert result_x == exp_x
+            assert np.allclose(result_y, exp_y, atol=1e-12)
+
+    def test_incremental(self, curve_bonds):
+        bonds = curve_bonds
+        engine = IncrementalBootstrap(bonds[:3])
+        assert engine.rates.sorted_key_vals() == bootstrap(bonds[:3]).sorted_key_vals()
+        engine.update_bond(bonds[3])
+        assert engine.rates.sorted_key_vals() == bootstrap(bonds).sorted_key_vals()
+        repriced = DatedBond("CRV2", 100.0, 0.0125, "2024-04-10", 99.0, 325, [140])
+        engine.update_bond(repriced)
+        expected = bootstrap([bonds[0], repriced] + bonds[2:])
+        assert engine.bonds[1] is repriced
+        assert engine.rates.sorted_key_vals() == expected.sorted_key_vals()
+        inserted = DatedBond("CRV5", 100.0, 0.015, "2024-04-10", 98.8, 600, [140, 325])
+        engine.update_bond(inserted)
+        expected = bootstrap([bonds[0], repriced, inserted] + bonds[2:])
+        assert engine.rates.sorted_key_vals() == expected.sorted_key_vals()
+
+    def test_incremental_unsorted_maturities(self, curve_bonds):
+        bonds = curve_bonds[::-1]
+        engine = IncrementalBootstrap(bonds)
+        assert [bond.isin for bond in engine.bonds] == ["CRV1", "CRV2", "CRV3", "CRV4"]
+        assert engine.rates.sorted_key_vals() == bootstrap(curve_bonds).sorted_key_vals()
+        inserted = DatedBond("CRV5", 100.0, 0.015, "2024-04-10", 98.8, 600, [140, 325])
+        engine.update_bond(inserted)
+        expected = curve_bonds[:2] + [inserted] + curve_bonds[2:]
+        assert engine.bonds == expected
+        assert engine.rates.sorted_key_vals() == bootstrap(expected).sorted_key_vals()
+        table_engine = IncrementalBootstrap(BondTable.from_bonds(bonds))
+        table_engine.update_bond(inserted)
+        assert table_engine.table().isin.tolist() == ["CRV1", "CRV2", "CRV5", "CRV3", "CRV4"]
+        assert table_engine.rates.sorted_key_vals() == bootstrap(expected).sorted_key_vals()
+
+    def test_derived_coupons(self, curve_bonds):
+        bonds = curve_bonds[:3]
+        r = bootstrap(bonds)
+        assert r.derived == {139, 324, 505, 689}
+        assert r.knots()[0] == [140, 325, 874]
+        assert bootstrap_matrix(bonds).derived == r.derived
+        engine = IncrementalBootstrap(bonds)
+        engine.update_bond(DatedBond("CRV2", 100.0, 0.0125, "2024-04-10", 99.0, 325, [140]))
+        assert engine.rates.derived == r.derived
+
+    def test_incremental_table(self, curve_bonds):
+        bonds = curve_bonds[:3]
+        company = Company("C", BondTable.from_bonds(bonds))
+        company.compute_rates()
+        repriced = DatedBond("CRV2", 100.0, 0.0125, "2024-04-10", 99.0, 325, [140])
+        inserted = DatedBond("CRV5", 100.0, 0.015, "2024-04-10", 98.8, 600, [140, 325])
+        company.update_bond(repriced)
+        company.update_bond(inserted)
+        expected = [bonds[0], repriced, inserted, bonds[2]]
+        assert company.rates.sorted_key_vals() == bootstrap(expected).sorted_key_vals()
+        assert company._bootstrap.bonds[1] is repriced
+        assert isinstance(company.bonds, BondTable)
+        assert company.bonds.isin.tolist() == ["CRV1", "CRV2", "CRV5", "CRV3"]
+        assert company.bonds.price.tolist() == [100.5, 99.0, 98.8, 98.1]
+        assert bootstrap(company.bonds).sorted_key_vals() == company.rates.sorted_key_vals()
+        company.update_bond(DatedBond("CRV5", 100.0, 0.015, "2024-04-10", 98.7, 600, [140, 325]))
+        assert company.bonds.price.tolist() == [100.5, 99.0, 98.7, 98.1]
@@ -0,0 +1,36 @@
+import os
+import pandas as pd
+from src.DataCache.DataCache import cached_frame, file_digest, load_frame, save_frame
+
+
+class TestDataCache:
+    def test_round_trip(self, tmp_path):
+        df = pd.DataFrame({"ISIN": ["A", "B", "C"],
+                           "Price Date": pd.to_datetime(["2024-01-08", "2024-01-09", "2024-01-10"]),
+                           "Price": [99.5, 98.0, 97.25],
+                           "Coupon Periods": [[], [53], [53, 237]]},
+                          index=[2, 5, 7])
+        filename = str(tmp_path / "frame.npz")
+        save_frame(df, filename)
+        result = load_frame(filename)
+        pd.testing.assert_frame_equal(result, df, check_dtype=False, check_index_type=False)
+        assert result["Coupon Periods"].tolist() == [[], [53], [53, 237]]
+        assert isinstance(result["Coupon Periods"].iloc[2][0], int)
+
+    def test_rebuilds_only_on_change(self, tmp_path):
+        source = tmp_path / "prices.csv"
+        source.write_text("Price\n1\n")
+        calls = []
+        def build():
+            calls.append(1)
+            return pd.read_csv(source)
+        cache_dir = str(tmp_path / "cache")
+        cached_frame(cache_dir, [str(source)], build)
+        cached_frame(cache_dir, [str(source)], build)
+        assert len(calls) == 1
+        old_digest = file_digest([str(source)])
+        source.write_text("Price\n2\n")
+        assert file_digest([str(source)]) != old_digest
+        df = cached_frame(cache_dir, [str(source)], build)
+        assert len(calls) == 2 and df["Price"].tolist() == [2]
+        assert len(os.listdir(cache_dir)) == 1
@@ -1,5 +1,10 @@
-from src.FinancialInstruments.Bond import DatedBond, sort_bond_list
+from src.FinancialInstruments.Bond import DatedBond, sort_bond_list, cashflow_matrices, \
+    batch_newton_raphson_ytm, newton_raphson_ytm, compute_spread, ytm_price, \
+    solve_ytm, solve_ytm_series, YTMCache, cached_ytms, \
+    coupon_schedules, offset_coupon_schedules, BondTable
 import numpy as np
+import pandas as pd
+import pytest
 
 class TestDatedBond:
     def test_sort(self):
@@ -11,4 +16,147 @@ class TestDatedBond:
         expected = [b1, b2, b3, b4]
         actual = sort_bond_list(lst)
         for i in range(4):
-            assert actual[i] == expected[i]
\ No newline at end of file
+            assert actual[i] == expected[i]
+
+    def test_cashflows(self):
+        bond = DatedBond("B1", 100, 0.02, np.datetime64("2024-04-10"), 99.5, 365, [182])
+        assert np.allclose(bond.times, [182/365, 1.0])
+        assert np.allclose(bond.amounts, [2.0, 102.0])
+        assert abs(ytm_price(bond, 0.0) - (104.0 - 99.5)) < 1e-9
+        assert not hasattr(bond, "__dict__")
+        assert bond.coupon_periods == [182] and bond.maturity_period == 365
+        assert not bond.times.flags.writeable and not bond.amounts.flags.writeable
+        with pytest.raises(AttributeError):
+            bond.coupon_periods = [100]
+
+class TestYTM:
+    def test_batch_matches_scalar(self):
+        bonds = [DatedBond("B1", 100, 0.02, np.datetime64("2024-04-10"), 99.5, 140, []),
+                 DatedBond("B2", 100, 0.0125, np.datetime64("2024-04-10"), 97.2, 325, [140]),
+                 DatedBond("B3", 100, 0.0175, np.datetime64("2024-04-10"), 96.1, 875, [140, 325, 506, 690])]
+        times, amounts, prices = cashflow_matrices(bonds)
+        assert times.shape == (3, 5) and amounts[0, 1] == 0
+        ytm, iterations, converged = batch_newton_raphson_ytm(times, amounts, prices)
+        assert converged.all()
+        for i, bond in enumerate(bonds):
+            assert abs(ytm[i] - newton_raphson_ytm(bond)) < 1e-9
+            assert 0 < iterations[i] < 1000
+        assert abs(compute_spread(bonds[0], bonds[2]) - (ytm[2] - ytm[0])) < 1e-9
+
+    def test_batch_flags_diverged(self, capsys):
+        bonds = [DatedBond("B1", 100, 0.02, np.datetime64("2024-04-10"), 99.5, 140, []),
+                 DatedBond("B2", 100, 0.0125, np.datetime64("2024-04-10"), 97.2, 325, [140])]
+        times, amounts, prices = cashflow_matrices(bonds)
+        amounts[1] = 0
+        ytm, _, converged = batch_newton_raphson_ytm(times, amounts, prices)
+        assert list(converged) == [True, False]
+        assert abs(ytm[0] - newton_raphson_ytm(bonds[0], cache=None)) < 1e-9 and np.isnan(ytm[1])
+        _, iterations, converged = batch_newton_raphson_ytm(times[:1], amounts[:1], prices[:1], max_iter=1)
+        assert not converged[0] and iterations[0] == 1
+        cache = YTMCache()
+        ytms = cached_ytms([DatedBond("B3", 100, 0.02, np.datetime64("2024-04-10"), 80.0, 140, []),
+                            DatedBond("B4", 0, 0.0, np.datetime64("2024-04-10"), 50.0, 140, [])],
+                           max_iter=2, cache=cache)
+        out = capsys.readouterr().out
+        assert out.count("Max number of iterations reached.") == 1 and out.count("Newton-Raphson diverged.") == 1
+        assert np.isfinite(ytms[0]) and np.isnan(ytms[1]) and len(cache) == 0
+
+    def test_solve_ytm(self):
+        bond = DatedBond("B3", 100, 0.0175, np.datetime64("2024-04-10"), 96.1, 875, [140, 325, 506, 690])
+        result = solve_ytm(bond)
+        assert result.converged and result.method == "newton"
+        assert abs(result.ytm - newton_raphson_ytm(bond)) < 1e-9
+        assert abs(result.residual) < 1e-6
+        warm = solve_ytm(bond, guess=result.ytm + 1e-4)
+        assert warm.converged and warm.iterations < result.iterations
+        diverged = solve_ytm(bond, guess=50.0)
+        assert diverged.converged and diverged.method == "brent"
+        assert abs(diverged.ytm - result.ytm) < 1e-6
+
+    def test_solve_ytm_series(self):
+        bonds = [DatedBond("B1", 100, 0.02, np.datetime64("2024-04-10"), 99.5, 325, [140]),
+                 DatedBond("B1", 100, 0.02, np.datetime64("2024-04-11"), 99.6, 324, [139])]
+        results = solve_ytm_series(bonds)
+        assert [r.converged for r in results] == [True, True]
+        assert results[1].iterations < results[0].iterations
+        assert abs(results[1].ytm - newton_raphson_ytm(bonds[1])) < 1e-9
+
+    def test_ytm_cache(self):
+        cache = YTMCache(maxsize=2)
+        b1 = DatedBond("B1", 100, 0.02, np.datetime64("2024-04-10"), 99.5, 325, [140])
+        b2 = DatedBond("B2", 100, 0.02, np.datetime64("2024-04-10"), 98.5, 690, [140, 325, 506])
+        ytm = newton_raphson_ytm(b1, cache=cache)
+        assert newton_raphson_ytm(b1, cache=cache) == ytm
+        assert cache.hits == 1 and cache.misses == 1
+        ytms = cached_ytms([b1, b2], cache=cache)
+        assert abs(ytms[0] - ytm) < 1e-12 and cache.hits == 2 and cache.misses == 2
+        assert abs(ytms[1] - newton_raphson_ytm(b2, cache=None)) < 1e-9
+        b3 = DatedBond("B1", 100, 0.02, np.datetime64("2024-04-11"), 99.6, 324, [139])
+        newton_raphson_ytm(b3, cache=cache)
+        assert len(cache) == 2 and cache.misses == 3
+        cache.invalidate("B1")
+        assert len(cache) == 1
+        cache.clear()
+        assert len(cache) == 0 and cache.hits == 0
+        spread = compute_spread(b1, b2, cache=cache)
+        assert compute_spread(b1, b2, cache=cache) == spread and cache.hits == 2
+        assert compute_spread(b1, b2) == spread and cache.hits == 2
+
+    def test_ytm_cache_keys_on_terms(self):
+        cache = YTMCache()
+        short = DatedBond("X1", 100, 0.01, np.datetime64("2024-04-10"), 99, 365, [])
+        long = DatedBond("X1", 100, 0.05, np.datetime64("2024-04-10"), 99, 1825, [365, 730, 1095, 1460])
+        assert abs(newton_raphson_ytm(short, cache=cache) - newton_raphson_ytm(short, cache=None)) < 1e-12
+        assert abs(newton_raphson_ytm(long, cache=cache) - newton_raphson_ytm(long, cache=None)) < 1e-12
+        ytms = cached_ytms(BondTable.from_bonds([short, long]), cache=cache)
+        assert cache.hits == 2
+        assert abs(ytms[1] - newton_raphson_ytm(long, cache=None)) < 1e-12
+
+
+class TestCouponSchedules:
+    def test_schedule_clamps_month_end(self):
+        dates, offsets = coupon_schedules(np.array(["2018-08-31", "2020-03-01"], dtype="datetime64[D]"),
+                                          np.array(["2020-02-28", "2021-03-01"], dtype="datetime64[D]"))
+        expected = ["2018-08-31", "2019-02-28", "2019-08-28", "2020-02-28",
+                    "2020-03-01", "2020-09-01", "2021-03-01"]
+        assert list(offsets) == [0, 4, 7]
+        assert list(dates) == list(np.array(expected, dtype="datetime64[D]"))
+
+    def test_offset_schedules(self):
+        df = pd.DataFrame({"ISIN": ["A", "A"],
+                           "Coupon Start Date": pd.to_datetime(["2020-03-01"] * 2),
+                           "Maturity Date": pd.to_datetime(["2022-03-01"] * 2),
+                           "Price Date": pd.to_datetime(["2020-03-01", "2021-04-10"])})
+        last, periods, offsets = offset_coupon_schedules(df, "Price Date")
+        assert list(last) == list(np.array(["2020-03-01", "2021-03-01"], dtype="datetime64[D]"))
+        assert list(offsets) == [0, 3, 4]
+        assert list(periods) == [184, 365, 549, 144]
+
+
+class TestBondTable:
+    def make_bonds(self):
+        return [DatedBond("CA1", 100, 0.01, np.datetime64("2024-04-10"), 99.5, 140, []),
+                DatedBond("CA2", 100, 0.0125, np.datetime64("2024-04-10"), 97.2, 325, [140]),
+                DatedBond("XS3", 100, 0.0175, np.datetime64("2024-04-11"), 96.1, 874, [139, 324, 505, 689])]
+
+    def test_views_and_slices(self):
+        bonds = self.make_bonds()
+        table = BondTable.from_bonds(bonds)
+        assert len(table) == 3
+        bond = table[2]
+        assert bond.isin == "XS3" and bond.coupon_periods == [139, 324, 505, 689]
+        assert np.allclose(bond.amounts, bonds[2].amounts)
+        assert len(table.on_date("2024-04-10")) == 2
+        assert table.for_issuer("CA").isin.tolist() == ["CA1", "CA2"]
+        sub = table.maturing_between(300, 1000)
+        assert sub.isin.tolist() == ["CA2", "XS3"]
+        assert sub[1].coupon_periods == [139, 324, 505, 689]
+        assert [b.isin for b in table[::-1]] == ["XS3", "CA2", "CA1"]
+
+    def test_cashflows_match_bonds(self):
+        bonds = self.make_bonds()
+        table = BondTable.from_bonds(bonds)
+        for a, b in zip(table.cashflow_matrices(), cashflow_matrices(bonds)):
+            assert np.allclose(a, b)
+        spreads = compute_spread(table.take([0, 0]), table.take([1, 2]))
+        assert abs(spreads[1] - compute_spread(bonds[0], bonds[2])) < 1e-12
@@ -1,4 +1,5 @@
-from src.FinancialInstruments.Option import Option
+import numpy as np
+from src.FinancialInstruments.Option import Option, OptionBatch
 TOL = 1e-3
 
 
@@ -9,4 +10,23 @@ class TestOption:
     
     def test_basic_delta(self):
         option = Option(300, 250, 0.03, 1, 0.15)
-        assert abs(option.delta() - 0.932) < TOL
\ No newline at end of file
+        assert abs(option.delta() - 0.932) < TOL
+
+class TestOptionBatch:
+    def test_matches_option(self):
+        params = [(300, 250, 0.03, 1, 0.15), (100, 120, 0.05, 2, 0.3), (50, 50, 0.01, 0.5, 0.6)]
+        batch = OptionBatch(*np.array(params).T)
+        price, delta, vega, prob = batch.evaluate()
+        for i, p in enumerate(params):
+            option = Option(*p)
+            assert abs(price[i] - option.price()) < 1e-10
+            assert abs(delta[i] - option.delta()) < 1e-12
+            assert abs(prob[i] - option.get_probability_of_exercise()) < 1e-12
+            h = 1e-6
+            bumped = (Option(p[0], p[1], p[2], p[3], p[4] + h).price() - Option(p[0], p[1], p[2], p[3], p[4] - h).price()) / (2*h)
+            assert abs(vega[i] - bumped) < 1e-5
+
+    def test_broadcast(self):
+        batch = OptionBatch(300, [200, 250, 300], 0.03, 1, 0.15)
+        assert len(batch) == 3
+        assert abs(batch.price()[1] - 58.82) < TOL
@@ -0,0 +1,80 @@
+from src.FinancialModels.FinancialModel import calibrate_merton, CreditMetricsModel
+from src.FinancialInstruments.Bond import YTMCache
+from src.FinancialInstruments.Option import Option
+import numpy as np
+import scipy.optimize
+
+TOL = 1e-8
+
+
+def merton_equations(x, S, sigma_S, K, r, t):
+    V, sigma_V = x
+    option = Option(V, K, r, t, sigma_V)
+    return [option.price() - S, option.delta() * sigma_V * V - sigma_S * S]
+
+
+class TestCalibrateMerton:
+    def test_matches_fsolve(self):
+        S = np.array([8700.0, 500.0, 120.0, 40.0])
+        sigma_S = np.array([0.3, 0.6, 0.45, 0.9])
+        K = np.array([25222.0, 800.0, 60.0, 100.0])
+        r = np.array([0.045, 0.03, 0.05, 0.04])
+        result = calibrate_merton(S, sigma_S, K, r)
+        assert result.converged.all()
+        assert np.all(result.residual <= 1e-10)
+        for i in range(len(S)):
+            expected = scipy.optimize.fsolve(merton_equations, [S[i] + K[i], sigma_S[i] * 0.5],
+                                             args=(S[i], sigma_S[i], K[i], r[i], 1.0), xtol=1e-12)
+            assert abs(result.assets[i] - expected[0]) / expected[0] < TOL
+            assert abs(result.asset_volatility[i] - expected[1]) < TOL
+
+    def test_broadcast_and_diagnostics(self):
+        result = calibrate_merton([100.0, 200.0], 0.4, 150.0, 0.03, t=2.0)
+        assert len(result) == 2
+        assert np.all(result.iterations > 0)
+        for V, sigma_V, S in zip(result.assets, result.asset_volatility, [100.0, 200.0]):
+            option = Option(V, 150.0, 0.03, 2.0, sigma_V)
+            assert abs(option.price() - S) / S < 1e-9
+            assert abs(option.delta() * sigma_V * V - 0.4 * S) / S < 1e-9
+
+
+class TestMertonModel:
+    def test_calibration_cached(self, merton_model):
+        model = merton_model
+        calls = []
+        solve = model._solve_asset_vals
+        model._solve_asset_vals = lambda: calls.append(1) or solve()
+        first = model.find_asset_vals()
+        assert model.find_asset_vals() == first
+        model.get_default_probs(5)
+        assert len(calls) == 1
+        model.company.debt = 4500.0
+        assert model.find_asset_vals() != first
+        assert len(calls) == 2
+
+    def test_default_probs(self, merton_model):
+        model = merton_model
+        assets, asset_volatility = model.find_asset_vals()
+        survival = 1.0
+        for y, p in enumerate(model.get_default_probs(5), start=1):
+            option = Option(assets, model.company.debt, model.government.rates[y*365], y, asset_volatility)
+            survival *= option.get_probability_of_exercise()
+            assert abs(p - (1 - survival)) < 1e-12
+
+    def test_simulated_matches_analytic(self, merton_model):
+        model = merton_model
+        result = model.simulate_default_probs(3, num_paths=100_000, seed=5)
+        expected = model.get_default_probs(3)
+        cumulative = 1 - np.cumprod(1 - result.terminal)
+        assert np.all(np.abs(cumulative - expected) < 0.01)
+
+
+class TestCreditMetricsModel:
+    def test_spread_cache_shared(self, government, stock_company):
+        cache = YTMCache()
+        first = CreditMetricsModel(government, stock_company, cache=cache)
+        misses = cache.misses
+        assert misses == 2 and cache.hits == 0
+        second = CreditMetricsModel(government, stock_company, cache=cache)
+        assert second.spread == first.spread
+        assert cache.misses == misses and cache.hits == 2
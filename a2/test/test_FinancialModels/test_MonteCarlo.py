@@ -0,0 +1,36 @@
+from src.FinancialModels.MonteCarlo import simulate_default_probs, Vasicek
+from src.FinancialInstruments.Option import OptionBatch
+import numpy as np
+
+V, SIGMA, K = 7000.0, 0.3, 5000.0
+HORIZONS = np.arange(1, 4)
+STEPS = 12
+
+
+def analytic(rates):
+    return 1 - OptionBatch(V, K, rates, HORIZONS, SIGMA).get_probability_of_exercise()
+
+
+class TestMonteCarlo:
+    def test_terminal_matches_closed_form(self):
+        times = np.arange(1, 3*STEPS + 1) / STEPS
+        spot = 0.03 + 0.002 * times
+        result = simulate_default_probs(V, SIGMA, K, HORIZONS, spot, 200_000, STEPS, 30_000, seed=7)
+        expected = analytic(0.03 + 0.002 * HORIZONS)
+        assert np.all(np.abs(result.terminal - expected) < 4 * result.terminal_se)
+        assert np.all(result.first_passage >= result.terminal)
+        assert np.all(np.diff(result.first_passage) >= 0)
+
+    def test_reproducible(self):
+        spot = np.full(3*STEPS, 0.03)
+        a = simulate_default_probs(V, SIGMA, K, HORIZONS, spot, 20_000, STEPS, 6_000, seed=3)
+        b = simulate_default_probs(V, SIGMA, K, HORIZONS, spot, 20_000, STEPS, 6_000, seed=3, jobs=2)
+        assert np.array_equal(a.terminal, b.terminal)
+        assert np.array_equal(a.first_passage, b.first_passage)
+
+    def test_vasicek_constant_rate(self):
+        # With no rate volatility and theta = r0 the short rate stays put
+        result = simulate_default_probs(V, SIGMA, K, HORIZONS, None, 100_000, STEPS, 25_000, seed=11,
+                                        vasicek=Vasicek(0.03, 0.5, 0.03, 0.0))
+        expected = analytic(np.full(3, 0.03))
+        assert np.all(np.abs(result.terminal - expected) < 4 * result.terminal_se)
@@ -0,0 +1,74 @@
+from src.FinancialModels.FinancialModel import calibrate_merton
+from src.FinancialModels.Scenario import run_scenarios, curve_shift
+from src.FinancialInstruments.Option import OptionBatch
+import numpy as np
+import pytest
+
+TOL = 1e-9
+
+
+class TestRunScenarios:
+    def test_base_matches_models(self, merton_model, credit_metrics_model):
+        merton, cm = merton_model, credit_metrics_model
+        result = run_scenarios(merton, cm, 5)
+        assert result.merton.shape == (1, 1, 1, 1, 1, 1, 5)
+        assert np.allclose(result.merton.ravel(), merton.get_default_probs(5), atol=TOL)
+        assert np.allclose(result.credit_metrics.ravel(), cm.get_annual_default_probs(5), atol=TOL)
+
+    def test_grid_matches_single_scenarios(self, merton_model, credit_metrics_model):
+        merton, cm = merton_model, credit_metrics_model
+        company, gov = merton.company, merton.government
+        debt, equity, vol = [0.8, 1.3], [0.6, 1.0], [0.9, 1.4]
+        parallel, twist, recovery = [-0.01, 0.02], [0.0, 0.003], [0.3, 0.5]
+        result = run_scenarios(merton, cm, 4, debt, equity, vol, parallel, twist, recovery,
+                               company_rates_move=False)
+        assert result.merton.shape == (2, 2, 2, 2, 2, 2, 4)
+        assert result.converged.all()
+        years = np.arange(1, 5)
+        rates = np.array(gov.rates.get_many(years*365))
+        i, j, k, l, m, o = 1, 0, 1, 1, 1, 0
+        K, S = company.debt * debt[i], company.equity * equity[j]
+        shifted = rates + curve_shift(years, parallel[l], twist[m])
+        calibration = calibrate_merton(S, company.stock.volatility * vol[k], K, shifted[0])
+        options = OptionBatch(calibration.assets[0], K, shifted, years, calibration.asset_volatility[0])
+        expected = 1. - np.cumprod(options.get_probability_of_exercise())
+        assert np.allclose(result.merton[i, j, k, l, m, o], expected, atol=TOL)
+        assert np.array_equal(result.merton[i, j, k, l, m, 0], result.merton[i, j, k, l, m, 1])
+
+        h = cm.spread - curve_shift(1.0, parallel[l], twist[m])
+        q = (np.exp(-h) - recovery[o]) / (1 - recovery[o])
+        assert np.allclose(result.credit_metrics[i, j, k, l, m, o], 1. - q**years, atol=TOL)
+
+    def test_to_frame(self, merton_model, credit_metrics_model):
+        merton, cm = merton_model, credit_metrics_model
+        result = run_scenarios(merton, cm, 3, debt=[0.9, 1.1], recovery=[0.4, 0.5])
+        df = result.to_frame()
+        assert len(df) == len(result) * 3 == 12
+        row = df[(df.debt == 1.1) & (df.recovery == 0.4) & (df.year == 2)].iloc[0]
+        assert row.merton == result.merton[1, 0, 0, 0, 0, 0, 1]
+        assert row.credit_metrics == result.credit_metrics[1, 0, 0, 0, 0, 0, 1]
+
+    def test_company_rates_move(self, merton_model, credit_metrics_model):
+        merton, cm = merton_model, credit_metrics_model
+        result = run_scenarios(merton, cm, 3, parallel=[-0.01, 0.0, 0.02], twist=[0.0, 0.004])
+        base = result.credit_metrics[0, 0, 0, 1, 0, 0]
+        assert np.allclose(result.credit_metrics, base, atol=TOL)
+        assert np.allclose(base, cm.get_annual_default_probs(3), atol=TOL)
+
+    def test_spread_below_zero_is_nan(self, merton_model, credit_metrics_model):
+        merton, cm = merton_model, credit_metrics_model
+        result = run_scenarios(merton, cm, 5, parallel=[0.0, 0.05], company_rates_move=False)
+        assert np.all(np.isfinite(result.credit_metrics[0, 0, 0, 0]))
+        assert np.all(np.isnan(result.credit_metrics[0, 0, 0, 1]))
+
+    @pytest.mark.parametrize("recovery", [[1.0], [-0.1], [0.4, 1.2]])
+    def test_invalid_recovery(self, merton_model, credit_metrics_model, recovery):
+        merton, cm = merton_model, credit_metrics_model
+        with pytest.raises(ValueError):
+            run_scenarios(merton, cm, 3, recovery=recovery)
+
+    def test_unconverged_merton_is_nan(self, merton_model, credit_metrics_model):
+        merton, cm = merton_model, credit_metrics_model
+        result = run_scenarios(merton, cm, 3, debt=[1.0, 2.0], max_iter=0)
+        assert result.converged[0].all() and not result.converged[1].any()
+        assert np.all(np.isfinite(result.merton[0])) and np.all(np.isnan(result.merton[1]))
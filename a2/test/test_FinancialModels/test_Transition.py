@@ -0,0 +1,68 @@
+from src.FinancialModels.Transition import check_transition_matrix, transition_powers, default_probs
+from src.FinancialModels.FinancialModel import CreditMetricsModel
+import numpy as np
+import pytest
+
+TOL = 1e-12
+
+
+def random_matrices(shape: tuple, k: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    M = rng.random(shape + (k, k)) * np.eye(k, k) * 20 + rng.random(shape + (k, k))
+    M[..., -1, :] = 0
+    M[..., -1, -1] = 1
+    return M / M.sum(axis=-1, keepdims=True)
+
+
+class TestCheckTransitionMatrix:
+    def test_valid(self):
+        M = random_matrices((3,), 5)
+        assert np.array_equal(check_transition_matrix(M), M)
+
+    @pytest.mark.parametrize("M", [
+        [[0.9, 0.1]],
+        [[0.9, 0.2], [0.0, 1.0]],
+        [[1.1, -0.1], [0.0, 1.0]],
+        [[0.9, 0.1], [0.5, 0.5]],
+    ])
+    def test_invalid(self, M):
+        with pytest.raises(ValueError):
+            check_transition_matrix(M)
+
+
+class TestTransitionPowers:
+    @pytest.mark.parametrize("num_years", [0, 1, 2, 5, 8, 30])
+    def test_matches_sequential(self, num_years):
+        M = random_matrices((2, 3), 6)
+        powers = transition_powers(M, num_years)
+        assert powers.shape == (2, 3, num_years, 6, 6)
+        A = M
+        for year in range(num_years):
+            assert np.allclose(powers[..., year, :, :], A, atol=TOL)
+            A = A @ M
+
+    def test_default_probs(self):
+        M = random_matrices((4,), 21)
+        states = np.array([0, 3, 10, 19])
+        probs = default_probs(M, 30, states)
+        assert probs.shape == (4, 30)
+        for i, state in enumerate(states):
+            assert np.allclose(probs[i], default_probs(M[i], 30, state), atol=TOL)
+            assert np.allclose(probs[i, 29], np.linalg.matrix_power(M[i], 30)[state, -1], atol=TOL)
+        assert np.all(np.diff(probs, axis=1) >= -TOL)
+
+
+class TestCreditMetricsModel:
+    def test_two_state(self, credit_metrics_model):
+        model = credit_metrics_model
+        q = model.get_q()
+        expected = [1 - q**n for n in range(1, 11)]
+        assert np.allclose(model.get_annual_default_probs(10), expected, atol=TOL)
+
+    def test_rating_matrix(self, government, stock_company):
+        M = random_matrices((), 8)
+        model = CreditMetricsModel(government, stock_company, transition_matrix=M, initial_state=2)
+        probs = model.get_annual_default_probs(12)
+        assert np.allclose(probs[-1], np.linalg.matrix_power(M, 12)[2, -1], atol=TOL)
+        with pytest.raises(ValueError):
+            CreditMetricsModel(government, stock_company, transition_matrix=M, initial_state=7)